@@ -18,25 +18,39 @@ from flask.json import jsonify
 from werkzeug.exceptions import BadRequest
 
 from src.constants import ENV
-from src.exceptions import NoFaceFoundError
+from src.exceptions import NoFaceFoundError, NoFileAttachedError, NoFileSelectedError, TooManyImagesError
+from src.services.dto.detection_options import DetectionOptions
 from src.services.facescan.plugins import base, managers
 from src.services.facescan.scanner.facescanners import scanner
 from src.services.flask_.constants import ARG
+from src.services.flask_.json_encoding import get_embedding_format
 from src.services.flask_.needs_attached_file import needs_attached_file
-from src.services.imgtools.read_img import read_img
+from src.services.imgtools.read_img import read_img, read_img_reduced
 from src.services.utils.pyutils import Constants
 from src.services.imgtools.test.files import IMG_DIR
 import base64
+import json
 from src.constants import SKIPPED_PLUGINS
 
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson')
 
-class FaceDetection(object):
-    SKIPPING_FACE_DETECTION = False
 
+def _get_detection_options() -> DetectionOptions:
+    return DetectionOptions(skip_detection=request.values.get("detect_faces") == "false")
 
-def face_detection_skip_check(face_plugins):
-    if request.values.get("detect_faces") == "false":
-        FaceDetection.SKIPPING_FACE_DETECTION = True
+
+def _read_img(file):
+    """ Image and its decode reduction; large JPEGs are decoded near IMG_LENGTH_LIMIT if enabled """
+    return read_img_reduced(file, ENV.IMG_LENGTH_LIMIT if ENV.REDUCED_IMG_DECODE else 0)
+
+
+def _scaled(faces, reduction: int):
+    """ Faces found in a reduced image, in coordinates of the original one """
+    return faces if reduction == 1 else [face.scaled(reduction) for face in faces]
+
+
+def face_detection_skip_check(face_plugins, options: DetectionOptions):
+    if options.skip_detection:
         restricted_plugins = [plugin for plugin in face_plugins if plugin.name not in SKIPPED_PLUGINS]
         return restricted_plugins
     else:
@@ -48,11 +62,13 @@ def endpoints(app):
     def init_model() -> None:
         detector = managers.plugin_manager.detector
         face_plugins = managers.plugin_manager.face_plugins
-        face_plugins = face_detection_skip_check(face_plugins)
+        options = _get_detection_options()
+        face_plugins = face_detection_skip_check(face_plugins, options)
         detector(
             img=read_img(str(IMG_DIR / 'einstein.jpeg')),
             det_prob_threshold=_get_det_prob_threshold(),
-            face_plugins=face_plugins
+            face_plugins=face_plugins,
+            options=options
         )
         print("Starting to load ML models")
         return None
@@ -81,17 +97,21 @@ def endpoints(app):
         face_plugins = managers.plugin_manager.filter_face_plugins(
             _get_face_plugin_names()
         )
-        face_plugins = face_detection_skip_check(face_plugins)
+        options = _get_detection_options()
+        face_plugins = face_detection_skip_check(face_plugins, options)
+        get_embedding_format()
         rawfile = base64.b64decode(request.get_json()["file"])
+        img, reduction = _read_img(rawfile)
 
         faces = detector(
-            img=read_img(rawfile),
+            img=img,
             det_prob_threshold=_get_det_prob_threshold(),
-            face_plugins=face_plugins
+            face_plugins=face_plugins,
+            options=options
         )
+        faces = _scaled(faces, reduction)
         plugins_versions = {p.slug: str(p) for p in [detector] + face_plugins}
         faces = _limit(faces, request.values.get(ARG.LIMIT))
-        FaceDetection.SKIPPING_FACE_DETECTION = False
         return jsonify(plugins_versions=plugins_versions, result=faces)
 
     @app.route('/find_faces', methods=['POST'])
@@ -101,27 +121,49 @@ def endpoints(app):
         face_plugins = managers.plugin_manager.filter_face_plugins(
             _get_face_plugin_names()
         )
-        face_plugins = face_detection_skip_check(face_plugins)
+        options = _get_detection_options()
+        face_plugins = face_detection_skip_check(face_plugins, options)
+        get_embedding_format()
+        img, reduction = _read_img(request.files['file'])
         faces = detector(
-            img=read_img(request.files['file']),
+            img=img,
             det_prob_threshold=_get_det_prob_threshold(),
-            face_plugins=face_plugins
+            face_plugins=face_plugins,
+            options=options
         )
+        faces = _scaled(faces, reduction)
         plugins_versions = {p.slug: str(p) for p in [detector] + face_plugins}
         faces = _limit(faces, request.values.get(ARG.LIMIT))
-        FaceDetection.SKIPPING_FACE_DETECTION = False
         return jsonify(plugins_versions=plugins_versions, result=faces)
 
     @app.route('/scan_faces', methods=['POST'])
     @needs_attached_file
     def scan_faces_post():
+        get_embedding_format()
+        img, reduction = _read_img(request.files['file'])
         faces = scanner.scan(
-            img=read_img(request.files['file']),
-            det_prob_threshold=_get_det_prob_threshold()
+            img=img,
+            det_prob_threshold=_get_det_prob_threshold(),
+            options=_get_detection_options()
         )
+        faces = _scaled(faces, reduction)
         faces = _limit(faces, request.values.get(ARG.LIMIT))
         return jsonify(calculator_version=scanner.ID, result=faces)
 
+    @app.route('/scan_faces_batch', methods=['POST'])
+    def scan_faces_batch_post():
+        get_embedding_format()
+        imgs, reductions = zip(*[_read_img(file) for file in _get_batch_files()])
+        faces_per_img = scanner.scan_batch(
+            imgs=list(imgs),
+            det_prob_threshold=_get_det_prob_threshold(),
+            options=_get_detection_options()
+        )
+        faces_per_img = [_scaled(faces, reduction) for faces, reduction in zip(faces_per_img, reductions)]
+        limit = request.values.get(ARG.LIMIT)
+        result = [{'result': _limit(faces, limit, allow_empty=True)} for faces in faces_per_img]
+        return jsonify(calculator_version=scanner.ID, result=result)
+
 
 def _get_det_prob_threshold():
     det_prob_threshold_val = request.values.get(ARG.DET_PROB_THRESHOLD)
@@ -133,6 +175,41 @@ def _get_det_prob_threshold():
     return det_prob_threshold
 
 
+def _get_batch_files() -> List:
+    """
+    Images of a batch request: either multipart with several 'file' parts,
+    or an NDJSON body with one {"file": "<base64>"} object per line.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        lines = [line for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        _check_batch_size(len(lines))
+        try:
+            files = [base64.b64decode(json.loads(line)['file']) for line in lines]
+        except (ValueError, KeyError, TypeError) as e:
+            raise BadRequest('Each NDJSON line must be an object with a base64 "file"') from e
+    else:
+        if 'file' not in request.files:
+            raise NoFileAttachedError
+        files = request.files.getlist('file')
+        _check_batch_size(len(files))
+        if any(file.filename == '' for file in files):
+            raise NoFileSelectedError
+    if not files:
+        raise NoFileAttachedError
+    return files
+
+
+def _check_batch_size(count: int):
+    """
+    >>> _check_batch_size(ENV.MAX_BATCH_IMAGES)
+    >>> from src.services.utils.pytestutils import raises
+    >>> raises(TooManyImagesError, lambda: _check_batch_size(ENV.MAX_BATCH_IMAGES + 1))
+    True
+    """
+    if count > ENV.MAX_BATCH_IMAGES:
+        raise TooManyImagesError
+
+
 def _get_face_plugin_names() -> Optional[List[str]]:
     if ARG.FACE_PLUGINS not in request.values:
         return []
@@ -141,8 +218,12 @@ def _get_face_plugin_names() -> Optional[List[str]]:
     ]
 
 
-def _limit(faces: List, limit: str = None) -> List:
+def _limit(faces: List, limit: str = None, allow_empty: bool = False) -> List:
     """
+    Raises NoFaceFoundError for an empty list unless allow_empty (batch results keep images without faces).
+
+    >>> _limit([], 1, allow_empty=True)
+    []
     >>> _limit([1, 2, 3], None)
     [1, 2, 3]
     >>> _limit([1, 2, 3], '')
@@ -154,7 +235,7 @@ def _limit(faces: List, limit: str = None) -> List:
     >>> _limit([1, 2, 3], 2)
     [1, 2]
     """
-    if len(faces) == 0:
+    if len(faces) == 0 and not allow_empty:
         raise NoFaceFoundError
 
     try:
@@ -23,6 +23,7 @@ from src._endpoints import endpoints
 from src.constants import ENV
 from src.docs import DOCS_DIR
 from src.init_runtime import init_runtime
+from src.services.facescan.plugins import managers
 from src.services.flask_.disable_caching import disable_caching
 from src.services.flask_.error_handling import add_error_handling
 from src.services.flask_.json_encoding import add_json_encoding
@@ -52,6 +53,8 @@ def create_app(add_endpoints_fun: Union[Callable, None] = None, do_add_docs: boo
 
 def wsgi_app():
     init_app_runtime()
+    if ENV.WARM_UP_MODELS:
+        managers.plugin_manager.warm_up()
     logger.debug("Creating new app for WSGI")
     return create_app(endpoints, DOCS_DIR)
 
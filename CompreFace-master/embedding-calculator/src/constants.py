@@ -22,6 +22,8 @@ _DEFAULT_SCANNER = 'Facenet2018'
 class ENV(Constants):
     ML_PORT = int(get_env('ML_PORT', '3000'))
     IMG_LENGTH_LIMIT = int(get_env('IMG_LENGTH_LIMIT', '640'))
+    REDUCED_IMG_DECODE = get_env_bool('REDUCED_IMG_DECODE', False)
+    MAX_BATCH_IMAGES = int(get_env('MAX_BATCH_IMAGES', '32'))
 
     FACE_DETECTION_PLUGIN = get_env('FACE_DETECTION_PLUGIN', 'facenet.FaceDetector')
     CALCULATION_PLUGIN = get_env('CALCULATION_PLUGIN', 'facenet.Calculator')
@@ -35,6 +37,7 @@ class ENV(Constants):
     INTEL_OPTIMIZATION = get_env_bool('INTEL_OPTIMIZATION')
 
     RUN_MODE = get_env_bool('RUN_MODE', False)
+    WARM_UP_MODELS = get_env_bool('WARM_UP_MODELS', True)
 
 
 LOGGING_LEVEL = logging._nameToLevel[ENV.LOGGING_LEVEL_NAME]
@@ -29,6 +29,10 @@ class NoFileSelectedError(BadRequest):
     description = "No file is selected"
 
 
+class TooManyImagesError(BadRequest):
+    description = f"Too many images in one batch (at most {ENV.MAX_BATCH_IMAGES})"
+
+
 class NoFaceFoundError(BadRequest):
     description = "No face is found in the given image"
 
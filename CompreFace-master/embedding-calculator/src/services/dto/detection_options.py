@@ -0,0 +1,29 @@
+#  Copyright (c) 2020 the original author or authors
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+#  or implied. See the License for the specific language governing
+#  permissions and limitations under the License.
+
+import attr
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class DetectionOptions:
+    """
+    Request-scoped detection settings. They are passed down to the detector with every call
+    instead of being kept on shared objects, so concurrent requests in one process can't see
+    each other's settings.
+    """
+    # treat the whole image as a single face instead of running the detector
+    skip_detection: bool = False
+
+
+DEFAULT_DETECTION_OPTIONS = DetectionOptions()
@@ -75,6 +75,15 @@ class FaceDTO(JSONEncodable):
             if isinstance(dto, EmbeddingDTO):
                 return dto.embedding
 
+    def scaled(self, coefficient: int) -> 'FaceDTO':
+        """ The face with its box and landmarks moved to an image `coefficient` times larger """
+        plugins_dto = [
+            attr.evolve(dto, landmarks=[(x * coefficient, y * coefficient) for x, y in dto.landmarks])
+            if isinstance(dto, LandmarksDTO) else dto
+            for dto in self._plugins_dto
+        ]
+        return attr.evolve(self, box=self.box.scaled(coefficient), plugins_dto=plugins_dto)
+
     @classmethod
     def from_request(cls, result):
         return FaceDTO(box=BoundingBoxDTO(**result['box']),
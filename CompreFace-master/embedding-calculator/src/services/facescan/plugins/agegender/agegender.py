@@ -12,7 +12,7 @@
 #  or implied. See the License for the specific language governing
 #  permissions and limitations under the License.
 
-from typing import Tuple, Union
+from typing import List, Tuple, Union
 
 import numpy as np
 import tensorflow.compat.v1 as tf1
@@ -46,12 +46,15 @@ class BaseAgeGender(base.BasePlugin):
             saver.restore(sess, checkpoint.model_checkpoint_path)
             softmax_output = tf1.nn.softmax(logits)
 
-            def get_value(img: Array3D) -> Tuple[Union[str, Tuple], float]:
-                img = np.expand_dims(helpers.prewhiten(img), 0)
-                output = sess.run(softmax_output, feed_dict={images: img})[0]
-                best_i = int(np.argmax(output))
-                return labels[best_i], output[best_i]
-            return get_value
+            def get_values(imgs: List[Array3D]) -> List[Tuple[Union[str, Tuple], float]]:
+                batch = np.stack([helpers.prewhiten(img) for img in imgs])
+                outputs = sess.run(softmax_output, feed_dict={images: batch})
+                best = np.argmax(outputs, axis=1)
+                return [(labels[int(i)], output[i]) for i, output in zip(best, outputs)]
+            return get_values
+
+    def _predict(self, faces: List[plugin_result.FaceDTO]):
+        return self._model([face._face_img for face in faces])
 
 
 class AgeDetector(BaseAgeGender):
@@ -62,8 +65,11 @@ class AgeDetector(BaseAgeGender):
     )
 
     def __call__(self, face: plugin_result.FaceDTO):
-        value, probability = self._model(face._face_img)
-        return plugin_result.AgeDTO(age=value, age_probability=probability)
+        return self.process_batch([face])[0]
+
+    def process_batch(self, faces: List[plugin_result.FaceDTO]):
+        return [plugin_result.AgeDTO(age=value, age_probability=probability)
+                for value, probability in self._predict(faces)]
 
 
 class GenderDetector(BaseAgeGender):
@@ -74,6 +80,9 @@ class GenderDetector(BaseAgeGender):
     )
 
     def __call__(self, face: plugin_result.FaceDTO):
-        value, probability = self._model(face._face_img)
-        return plugin_result.GenderDTO(gender=value, gender_probability=probability)
+        return self.process_batch([face])[0]
+
+    def process_batch(self, faces: List[plugin_result.FaceDTO]):
+        return [plugin_result.GenderDTO(gender=value, gender_probability=probability)
+                for value, probability in self._predict(faces)]
 
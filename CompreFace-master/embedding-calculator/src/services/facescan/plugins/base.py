@@ -17,7 +17,7 @@ import logging
 import tempfile
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Tuple, Optional
+from typing import Any, List, Tuple, Optional
 from zipfile import ZipFile
 
 import attr
@@ -146,3 +146,10 @@ class BasePlugin(ABC):
     @abstractmethod
     def __call__(self, face: plugin_result.FaceDTO) -> JSONEncodable:
         raise NotImplementedError
+
+    def process_batch(self, faces: List[plugin_result.FaceDTO]) -> List[JSONEncodable]:
+        """
+        Process all faces of an image, one result per face in the same order.
+        Plugins with a batched model override it to run one forward pass per image.
+        """
+        return [self(face) for face in faces]
@@ -12,7 +12,7 @@
 #  or implied. See the License for the specific language governing
 #  permissions and limitations under the License.
 
-from typing import Tuple, Union
+from typing import List, Tuple, Union
 
 import numpy as np
 import tensorflow as tf2
@@ -42,19 +42,24 @@ class MaskDetector(base.BasePlugin):
     def _model(self):
         model = tf2.keras.models.load_model(str(self.ml_model.path))
 
-        def get_value(img: Array3D) -> Tuple[Union[str, Tuple], float]:
-            img = cv2.resize(img, dsize=(self.INPUT_IMAGE_SIZE, self.INPUT_IMAGE_SIZE),
-                             interpolation=cv2.INTER_CUBIC)
-            img = np.expand_dims(img, 0)
+        def get_values(imgs: List[Array3D]) -> List[Tuple[Union[str, Tuple], float]]:
+            batch = np.stack([
+                cv2.resize(img, dsize=(self.INPUT_IMAGE_SIZE, self.INPUT_IMAGE_SIZE),
+                           interpolation=cv2.INTER_CUBIC)
+                for img in imgs
+            ])
 
-            scores = model.predict(img)
-            val = self.LABELS[int(np.argmax(scores, axis=1)[0])]
-            prob = scores[0][int(np.argmax(scores, axis=1)[0])]
-            return val, prob
-        return get_value
+            scores = model.predict(batch)
+            best = np.argmax(scores, axis=1)
+            return [(self.LABELS[int(i)], score[i]) for i, score in zip(best, scores)]
+        return get_values
 
     def __call__(self, face: plugin_result.FaceDTO):
-        value, probability = self._model(face._face_img)
-        return plugin_result.MaskDTO(mask=value, mask_probability=probability)
+        return self.process_batch([face])[0]
+
+    def process_batch(self, faces: List[plugin_result.FaceDTO]):
+        values = self._model([face._face_img for face in faces])
+        return [plugin_result.MaskDTO(mask=value, mask_probability=probability)
+                for value, probability in values]
 
 
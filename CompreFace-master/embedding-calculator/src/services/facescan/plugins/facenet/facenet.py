@@ -13,7 +13,6 @@
 #  permissions and limitations under the License.
 
 import logging
-import math
 from collections import namedtuple
 from typing import List
 
@@ -28,6 +27,7 @@ from mtcnn import MTCNN
 
 from src.constants import ENV
 from src.services.dto.bounding_box import BoundingBoxDTO
+from src.services.dto.detection_options import DetectionOptions, DEFAULT_DETECTION_OPTIONS
 from src.services.facescan.plugins import mixins
 from src.services.facescan.imgscaler.imgscaler import ImgScaler
 from src.services.imgtools.proc_img import crop_img, squish_img
@@ -35,7 +35,6 @@ from src.services.imgtools.types import Array3D
 from src.services.utils.pyutils import get_current_dir
 
 from src.services.facescan.plugins import base
-from src._endpoints import FaceDetection
 
 CURRENT_DIR = get_current_dir(__file__)
 
@@ -53,6 +52,20 @@ def prewhiten(img):
     return y
 
 
+def prewhiten_batch(imgs: List[Array3D]) -> np.ndarray:
+    """ Normalize images of the same shape into one float32 array (N, H, W, C)."""
+    batch = np.empty((len(imgs),) + imgs[0].shape, dtype=np.float32)
+    for i, img in enumerate(imgs):
+        batch[i] = img
+    axes = tuple(range(1, batch.ndim))
+    mean = batch.mean(axis=axes, keepdims=True)
+    std = batch.std(axis=axes, keepdims=True)
+    std_adj = np.maximum(std, 1.0 / np.sqrt(batch[0].size))
+    batch -= mean
+    batch /= std_adj
+    return batch
+
+
 class FaceDetector(mixins.FaceDetectorMixin, base.BasePlugin):
     FACE_MIN_SIZE = 20
     SCALE_FACTOR = 0.709
@@ -83,14 +96,15 @@ class FaceDetector(mixins.FaceDetectorMixin, base.BasePlugin):
     def crop_face(self, img: Array3D, box: BoundingBoxDTO) -> Array3D:
         return squish_img(crop_img(img, box), (self.IMAGE_SIZE, self.IMAGE_SIZE))
 
-    def find_faces(self, img: Array3D, det_prob_threshold: float = None) -> List[BoundingBoxDTO]:
+    def find_faces(self, img: Array3D, det_prob_threshold: float = None,
+                   options: DetectionOptions = DEFAULT_DETECTION_OPTIONS) -> List[BoundingBoxDTO]:
         if det_prob_threshold is None:
             det_prob_threshold = self.det_prob_threshold
         assert 0 <= det_prob_threshold <= 1
         scaler = ImgScaler(self.IMG_LENGTH_LIMIT)
         img = scaler.downscale_img(img)
 
-        if FaceDetection.SKIPPING_FACE_DETECTION:
+        if options.skip_detection:
             bounding_boxes = []
             bounding_boxes.append({
                 'box': [0, 0, img.shape[0], img.shape[1]],
@@ -151,7 +165,10 @@ class Calculator(mixins.CalculatorMixin, base.BasePlugin):
         return str(self.ml_model.path / f'{self.ml_model.name}.pb')
 
     def calc_embedding(self, face_img: Array3D) -> Array3D:
-        return self._calculate_embeddings([face_img])[0]
+        return self.calc_embeddings([face_img])[0]
+
+    def calc_embeddings(self, face_imgs: List[Array3D]) -> Array3D:
+        return self._calculate_embeddings(face_imgs)
 
     @cached_property
     def _embedding_calculator(self):
@@ -164,20 +181,21 @@ class Calculator(mixins.CalculatorMixin, base.BasePlugin):
             return _EmbeddingCalculator(graph=graph, sess=tf1.Session(graph=graph))
 
     def _calculate_embeddings(self, cropped_images):
-        """Run forward pass to calculate embeddings"""
-        prewhitened_images = [prewhiten(img) for img in cropped_images]
+        """Run forward pass to calculate embeddings, BATCH_SIZE images per pass"""
         calc_model = self._embedding_calculator
         graph_images_placeholder = calc_model.graph.get_tensor_by_name("input:0")
         graph_embeddings = calc_model.graph.get_tensor_by_name("embeddings:0")
         graph_phase_train_placeholder = calc_model.graph.get_tensor_by_name("phase_train:0")
         embedding_size = graph_embeddings.get_shape()[1]
-        image_count = len(prewhitened_images)
-        batches_per_epoch = int(math.ceil(1.0 * image_count / self.BATCH_SIZE))
-        embeddings = np.zeros((image_count, embedding_size))
-        for i in range(batches_per_epoch):
-            start_index = i * self.BATCH_SIZE
-            end_index = min((i + 1) * self.BATCH_SIZE, image_count)
-            feed_dict = {graph_images_placeholder: prewhitened_images, graph_phase_train_placeholder: False}
+        image_count = len(cropped_images)
+        embeddings = np.zeros((image_count, embedding_size), dtype=np.float32)
+        if image_count == 0:
+            return embeddings
+        prewhitened_images = prewhiten_batch(cropped_images)
+        for start_index in range(0, image_count, self.BATCH_SIZE):
+            end_index = min(start_index + self.BATCH_SIZE, image_count)
+            feed_dict = {graph_images_placeholder: prewhitened_images[start_index:end_index],
+                         graph_phase_train_placeholder: False}
             embeddings[start_index:end_index, :] = calc_model.sess.run(
                 graph_embeddings, feed_dict=feed_dict)
         return embeddings
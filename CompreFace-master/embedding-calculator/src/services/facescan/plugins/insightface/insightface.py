@@ -21,14 +21,15 @@ from cached_property import cached_property
 
 from src.constants import ENV
 from src.services.dto.bounding_box import BoundingBoxDTO
+from src.services.dto.detection_options import DetectionOptions, DEFAULT_DETECTION_OPTIONS
 from src.services.dto.json_encodable import JSONEncodable
 from src.services.facescan.imgscaler.imgscaler import ImgScaler
 from src.services.facescan.plugins import base, mixins, exceptions
 from src.services.facescan.plugins.insightface import helpers as insight_helpers
 from src.services.dto import plugin_result
 from src.services.imgtools.types import Array3D
+from src.services.imgtools.nms import nms
 import collections
-from src._endpoints import FaceDetection
 
 
 logger = logging.getLogger(__name__)
@@ -42,12 +43,16 @@ if ENV.RUN_MODE:
                                     face_recognition, face_genderage)
     from insightface.utils import face_align
 
+    class RetinaFaceDetector(face_detection.FaceDetector):
+        def nms(self, dets):
+            return nms(dets[:, 0:4], dets[:, 4], self.nms_threshold).tolist()
+
     class DetectionOnlyFaceAnalysis(FaceAnalysis):
         rec_model = None
         ga_model = None
 
         def __init__(self, file):
-            self.det_model = face_detection.FaceDetector(file, 'net3')
+            self.det_model = RetinaFaceDetector(file, 'net3')
 
 
 class InsightFaceMixin:
@@ -80,14 +85,15 @@ class FaceDetector(InsightFaceMixin, mixins.FaceDetectorMixin, base.BasePlugin):
         model.prepare(ctx_id=self._CTX_ID, nms=self._NMS)
         return model
 
-    def find_faces(self, img: Array3D, det_prob_threshold: float = None) -> List[BoundingBoxDTO]:
+    def find_faces(self, img: Array3D, det_prob_threshold: float = None,
+                   options: DetectionOptions = DEFAULT_DETECTION_OPTIONS) -> List[BoundingBoxDTO]:
         if det_prob_threshold is None:
             det_prob_threshold = self.det_prob_threshold
         assert 0 <= det_prob_threshold <= 1
         scaler = ImgScaler(self.IMG_LENGTH_LIMIT)
         img = scaler.downscale_img(img)
 
-        if FaceDetection.SKIPPING_FACE_DETECTION:
+        if options.skip_detection:
             Face = collections.namedtuple('Face', [
                 'bbox', 'landmark', 'det_score', 'embedding', 'gender', 'age', 'embedding_norm', 'normed_embedding'])
             ret = []
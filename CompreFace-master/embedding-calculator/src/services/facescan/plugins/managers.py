@@ -20,6 +20,8 @@ from cached_property import cached_property
 
 from src import constants
 from src.services.facescan.plugins import base, mixins
+from src.services.imgtools.read_img import read_img
+from src.services.imgtools.test.files import IMG_DIR
 
 
 ML_MODEL_SEPARATOR = '@'
@@ -87,6 +89,13 @@ class PluginManager:
         return [pl for pl in self.face_plugins
                 if slugs is None or pl.slug in slugs]
 
+    def warm_up(self):
+        """
+        Loads and traces the detector networks before the first request. A sample image with
+        a face is scanned, so every detection stage (e.g. MTCNN R-Net and O-Net) runs once.
+        """
+        self.detector.find_faces(read_img(IMG_DIR / 'einstein.jpeg'))
+
     def get_plugin_by_class(self, plugin_class: Type):
         for plugin in self.plugins:
             if isinstance(plugin, plugin_class):
@@ -20,6 +20,7 @@ from contextlib import contextmanager
 from typing import List, Tuple
 
 from src.services.dto.bounding_box import BoundingBoxDTO
+from src.services.dto.detection_options import DetectionOptions, DEFAULT_DETECTION_OPTIONS
 from src.services.dto import plugin_result
 from src.services.imgtools.types import Array3D
 from src.services.facescan.plugins import base, exceptions
@@ -41,16 +42,28 @@ class FaceDetectorMixin(ABC):
     face_plugins: List[base.BasePlugin] = []
 
     def __call__(self, img: Array3D, det_prob_threshold: float = None,
-                 face_plugins: Tuple[base.BasePlugin] = ()) -> List[plugin_result.FaceDTO]:
+                 face_plugins: Tuple[base.BasePlugin] = (),
+                 options: DetectionOptions = DEFAULT_DETECTION_OPTIONS) -> List[plugin_result.FaceDTO]:
         """ Returns cropped and normalized faces."""
-        faces = self._fetch_faces(img, det_prob_threshold)
-        for face in faces:
-            self._apply_face_plugins(face, face_plugins)
+        faces = self._fetch_faces(img, det_prob_threshold, options)
+        if faces:
+            self._apply_face_plugins(faces, face_plugins)
         return faces
 
-    def _fetch_faces(self, img: Array3D, det_prob_threshold: float = None):
+    def detect_batch(self, imgs: List[Array3D], det_prob_threshold: float = None,
+                     face_plugins: Tuple[base.BasePlugin] = (),
+                     options: DetectionOptions = DEFAULT_DETECTION_OPTIONS) -> List[List[plugin_result.FaceDTO]]:
+        """ Returns faces of every image, with plugins applied to the faces of all images at once."""
+        faces_per_img = [self._fetch_faces(img, det_prob_threshold, options) for img in imgs]
+        all_faces = [face for faces in faces_per_img for face in faces]
+        if all_faces:
+            self._apply_face_plugins(all_faces, face_plugins)
+        return faces_per_img
+
+    def _fetch_faces(self, img: Array3D, det_prob_threshold: float = None,
+                     options: DetectionOptions = DEFAULT_DETECTION_OPTIONS):
         with elapsed_time_contextmanager() as get_elapsed_time:
-            boxes = self.find_faces(img, det_prob_threshold)
+            boxes = self.find_faces(img, det_prob_threshold, options)
             # sort by face area
             boxes = sorted(boxes, key=lambda x: x.width * x.height, reverse=True)
 
@@ -61,20 +74,24 @@ class FaceDetectorMixin(ABC):
             ) for box in boxes
         ]
 
-    def _apply_face_plugins(self, face: plugin_result.FaceDTO,
+    def _apply_face_plugins(self, faces: List[plugin_result.FaceDTO],
                             face_plugins: Tuple[base.BasePlugin]):
+        """ Runs each plugin once over all faces of the image. """
         for plugin in face_plugins:
             try:
                 with elapsed_time_contextmanager() as get_elapsed_time:
-                    result_dto = plugin(face)
-                face._plugins_dto.append(result_dto)
+                    result_dtos = plugin.process_batch(faces)
+                for face, result_dto in zip(faces, result_dtos):
+                    face._plugins_dto.append(result_dto)
             except Exception as e:
                 raise exceptions.PluginError(f'{plugin} error - {e}')
             else:
-                face.execution_time[plugin.slug] = get_elapsed_time()
+                for face in faces:
+                    face.execution_time[plugin.slug] = get_elapsed_time() // len(faces)
 
     @abstractmethod
-    def find_faces(self, img: Array3D, det_prob_threshold: float = None) -> List[BoundingBoxDTO]:
+    def find_faces(self, img: Array3D, det_prob_threshold: float = None,
+                   options: DetectionOptions = DEFAULT_DETECTION_OPTIONS) -> List[BoundingBoxDTO]:
         """ Find face bounding boxes, without calculating embeddings"""
         raise NotImplementedError
 
@@ -96,6 +113,10 @@ class CalculatorMixin(ABC):
             embedding=self.calc_embedding(face._face_img)
         )
 
+    def process_batch(self, faces: List[plugin_result.FaceDTO]) -> List[plugin_result.EmbeddingDTO]:
+        embeddings = self.calc_embeddings([face._face_img for face in faces])
+        return [plugin_result.EmbeddingDTO(embedding=embedding) for embedding in embeddings]
+
     def create_ml_model(self, *args):
         return base.CalculatorModel(self, *args)
 
@@ -104,6 +125,10 @@ class CalculatorMixin(ABC):
         """ Calculate embedding of a given face """
         raise NotImplementedError
 
+    def calc_embeddings(self, face_imgs: List[Array3D]) -> Array3D:
+        """ Calculate embeddings of several faces, one row per face """
+        return np.array([self.calc_embedding(face_img) for face_img in face_imgs])
+
 
 class LandmarksDetectorMixin:
     slug = "landmarks"
@@ -0,0 +1,50 @@
+#  Copyright (c) 2020 the original author or authors
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+#  or implied. See the License for the specific language governing
+#  permissions and limitations under the License.
+
+import numpy as np
+import pytest
+
+from sample_images import IMG_DIR
+from sample_images.annotations import SAMPLE_IMAGES
+from src.services.facescan.scanner.test._cache import read_img
+from src.services.facescan.plugins.managers import plugin_manager
+
+
+@pytest.mark.performance
+def test__given_more_faces_than_batch_size__when_calc_embeddings__then_matches_single_face_results():
+    calculator = plugin_manager.calculator
+    img = read_img(IMG_DIR / SAMPLE_IMAGES[0].img_name)
+    face_imgs = [face._face_img for face in plugin_manager.detector(img)]
+    face_imgs = (face_imgs * 60)[:60]
+
+    embeddings = calculator.calc_embeddings(face_imgs)
+
+    assert len(embeddings) == len(face_imgs)
+    for face_img, embedding in zip(face_imgs[:3], embeddings[:3]):
+        assert np.allclose(calculator.calc_embedding(face_img), embedding, atol=1e-4)
+
+
+@pytest.mark.performance
+def test__given_image_with_several_faces__when_detector_applies_plugins__then_batched_results_match_single_face():
+    calculator = plugin_manager.calculator
+    sample = max(SAMPLE_IMAGES, key=lambda s: len(s.noses))
+    img = read_img(IMG_DIR / sample.img_name)
+
+    faces = plugin_manager.detector(img, face_plugins=plugin_manager.face_plugins)
+
+    assert len(faces) > 1
+    for face in faces:
+        assert len(face._plugins_dto) == len(plugin_manager.face_plugins)
+        assert all(plugin.slug in face.execution_time for plugin in plugin_manager.face_plugins)
+        assert np.allclose(calculator(face).embedding, face.embedding, atol=1e-4)
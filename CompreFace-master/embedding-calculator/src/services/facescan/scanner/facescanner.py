@@ -18,6 +18,7 @@ from typing import List
 import numpy as np
 
 from src.services.dto.bounding_box import BoundingBoxDTO
+from src.services.dto.detection_options import DetectionOptions, DEFAULT_DETECTION_OPTIONS
 from src.services.dto.plugin_result import FaceDTO, EmbeddingDTO
 from src.services.imgtools.types import Array3D
 from src.services.facescan.plugins.managers import plugin_manager
@@ -35,12 +36,19 @@ class FaceScanner(ABC):
         return cls.instance
 
     @abstractmethod
-    def scan(self, img: Array3D, det_prob_threshold: float = None) -> List[FaceDTO]:
+    def scan(self, img: Array3D, det_prob_threshold: float = None,
+             options: DetectionOptions = None) -> List[FaceDTO]:
         """ Find face bounding boxes and calculate embeddings"""
         raise NotImplementedError
 
+    def scan_batch(self, imgs: List[Array3D], det_prob_threshold: float = None,
+                   options: DetectionOptions = None) -> List[List[FaceDTO]]:
+        """ Find faces and calculate embeddings in several images, one result list per image"""
+        return [self.scan(img, det_prob_threshold, options) for img in imgs]
+
     @abstractmethod
-    def find_faces(self, img: Array3D, det_prob_threshold: float = None) -> List[BoundingBoxDTO]:
+    def find_faces(self, img: Array3D, det_prob_threshold: float = None,
+                   options: DetectionOptions = None) -> List[BoundingBoxDTO]:
         """ Find face bounding boxes, without calculating embeddings"""
         raise NotImplementedError
 
@@ -58,12 +66,22 @@ class ScannerWithPluggins(FaceScanner):
     """
     ID = "ScannerWithPlugins"
 
-    def scan(self, img: Array3D, det_prob_threshold: float = None):
+    def scan(self, img: Array3D, det_prob_threshold: float = None,
+             options: DetectionOptions = None):
         return plugin_manager.detector(img, det_prob_threshold,
-                                       [plugin_manager.calculator])
+                                       [plugin_manager.calculator],
+                                       options=options or DEFAULT_DETECTION_OPTIONS)
+
+    def scan_batch(self, imgs: List[Array3D], det_prob_threshold: float = None,
+                   options: DetectionOptions = None):
+        return plugin_manager.detector.detect_batch(imgs, det_prob_threshold,
+                                                    [plugin_manager.calculator],
+                                                    options=options or DEFAULT_DETECTION_OPTIONS)
 
-    def find_faces(self, img: Array3D, det_prob_threshold: float = None) -> List[BoundingBoxDTO]:
-        return plugin_manager.detector.find_faces(img, det_prob_threshold)
+    def find_faces(self, img: Array3D, det_prob_threshold: float = None,
+                   options: DetectionOptions = None) -> List[BoundingBoxDTO]:
+        return plugin_manager.detector.find_faces(img, det_prob_threshold,
+                                                  options or DEFAULT_DETECTION_OPTIONS)
 
     @property
     def difference_threshold(self):
@@ -73,10 +91,12 @@ class ScannerWithPluggins(FaceScanner):
 class MockScanner(FaceScanner):
     ID = 'MockScanner'
 
-    def scan(self, img: Array3D, det_prob_threshold: float = None) -> List[FaceDTO]:
+    def scan(self, img: Array3D, det_prob_threshold: float = None,
+             options: DetectionOptions = None) -> List[FaceDTO]:
         return [FaceDTO(box=BoundingBoxDTO(0, 0, 0, 0, 0),
                         plugins_dto=[EmbeddingDTO(embedding=np.random.rand(1))],
                         img=img, face_img=img)]
 
-    def find_faces(self, img: Array3D, det_prob_threshold: float = None) -> List[BoundingBoxDTO]:
+    def find_faces(self, img: Array3D, det_prob_threshold: float = None,
+                   options: DetectionOptions = None) -> List[BoundingBoxDTO]:
         return [BoundingBoxDTO(0, 0, 0, 0, 0)]
@@ -18,6 +18,8 @@ from typing import Type, Union
 from sample_images import IMG_DIR
 from sample_images.annotations import SAMPLE_IMAGES
 from src.services.dto.bounding_box import BoundingBoxDTO
+from src.services.dto.detection_options import DetectionOptions
+from src.services.facescan.plugins.managers import plugin_manager
 from src.services.facescan.scanner.facescanner import FaceScanner
 from src.services.facescan.scanner.facescanners import TESTED_SCANNERS
 from src.services.facescan.scanner.test._cache import read_img
@@ -65,6 +67,34 @@ def test__given_threshold_set_to_1__when_scanned__then_returns_no_faces(scanner_
     assert len(result) == 0
 
 
+@pytest.mark.integration
+def test__given_skip_detection_option__when_detected__then_returns_whole_image_only_for_that_call():
+    detector = plugin_manager.detector
+    img = read_img(IMG_DIR / '000_5.jpg')
+
+    skipped = detector(img, options=DetectionOptions(skip_detection=True))
+    detected = detector(img)
+
+    assert len(skipped) == 1
+    assert len(detected) == 5
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize('scanner_cls', TESTED_SCANNERS)
+def test__given_skip_detection_option__when_scanned__then_options_reach_detector(scanner_cls):
+    scanner: FaceScanner = scanner_cls()
+    img = read_img(IMG_DIR / '000_5.jpg')
+    options = DetectionOptions(skip_detection=True)
+
+    scanned = scanner.scan(img, options=options)
+    found = scanner.find_faces(img, options=options)
+    scanned_batch = scanner.scan_batch([img], options=options)
+
+    assert len(scanned) == 1
+    assert len(found) == 1
+    assert [len(faces) for faces in scanned_batch] == [1]
+
+
 @pytest.mark.performance
 @pytest.mark.parametrize('scanner_cls', TESTED_SCANNERS)
 @pytest.mark.parametrize('row', (k for k in SAMPLE_IMAGES if k.include_to_tests))
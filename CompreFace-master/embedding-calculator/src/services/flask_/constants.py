@@ -18,4 +18,5 @@ API_KEY_HEADER = 'X-Api-Key'
 class ARG:
     LIMIT = 'limit'
     DET_PROB_THRESHOLD = 'det_prob_threshold'
-    FACE_PLUGINS = 'face_plugins'
\ No newline at end of file
+    FACE_PLUGINS = 'face_plugins'
+    EMBEDDING_FORMAT = 'embedding_format'
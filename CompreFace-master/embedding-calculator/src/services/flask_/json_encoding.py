@@ -12,18 +12,72 @@
 #  or implied. See the License for the specific language governing
 #  permissions and limitations under the License.
 
+import base64
 from json import JSONEncoder
+from typing import List, Union
 
 import numpy as np
+from flask import has_request_context, request
 
+from src.exceptions import InvalidRequestArgumentValueError
 from src.services.dto.json_encodable import JSONEncodable
+from src.services.flask_.constants import ARG
+
+# 'list' keeps plain JSON numbers, the others send little-endian floats as one base64 string
+EMBEDDING_DTYPES = {
+    'list': None,
+    'base64_float32': np.dtype('<f4'),
+    'base64_float16': np.dtype('<f2'),
+}
+
+
+def encode_array(array: np.ndarray, embedding_format: str = 'list') -> Union[list, str]:
+    """
+    >>> encode_array(np.array([1.0, 0.5]))
+    [1.0, 0.5]
+    >>> encode_array(np.array([1.0, 0.5]), 'base64_float16')
+    'ADwAOA=='
+    """
+    dtype = EMBEDDING_DTYPES[embedding_format]
+    if dtype is None:
+        return array.tolist()
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode('ascii')
+
+
+def decode_array(value: Union[List[float], str], embedding_format: str = 'list') -> np.ndarray:
+    """
+    >>> decode_array('ADwAOA==', 'base64_float16')
+    array([1. , 0.5], dtype=float32)
+    """
+    dtype = EMBEDDING_DTYPES[embedding_format]
+    if dtype is None:
+        return np.array(value)
+    return np.frombuffer(base64.b64decode(value), dtype=dtype).astype(np.float32)
+
+
+def get_embedding_format() -> str:
+    """
+    Embedding format requested with the 'embedding_format' argument, 'list' by default.
+    Endpoints call it before doing any work, so an invalid value is rejected even if no embedding is returned.
+    """
+    if not has_request_context():
+        return 'list'
+    embedding_format = request.values.get(ARG.EMBEDDING_FORMAT) or 'list'
+    if embedding_format not in EMBEDDING_DTYPES:
+        raise InvalidRequestArgumentValueError(
+            f"Embedding format is invalid (one of {', '.join(EMBEDDING_DTYPES)})")
+    return embedding_format
 
 
 def add_json_encoding(app):
     class AppJSONEncoder(JSONEncoder):
         def default(self, obj):
             if isinstance(obj, JSONEncodable):
-                return obj.to_json()
+                data = obj.to_json()
+                # only the 'embedding' field follows embedding_format, other arrays stay lists
+                if isinstance(data, dict) and isinstance(data.get('embedding'), np.ndarray):
+                    data['embedding'] = encode_array(data['embedding'], get_embedding_format())
+                return data
             if isinstance(obj, np.ndarray):
                 return obj.tolist()
             return super().default(obj)
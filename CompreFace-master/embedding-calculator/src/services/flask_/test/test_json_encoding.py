@@ -0,0 +1,65 @@
+#  Copyright (c) 2020 the original author or authors
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+#  or implied. See the License for the specific language governing
+#  permissions and limitations under the License.
+
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+
+from src.services.dto.bounding_box import BoundingBoxDTO
+from src.services.dto.plugin_result import EmbeddingDTO, FaceDTO
+from src.services.flask_.json_encoding import decode_array
+from src.services.imgtools.test.files import IMG_DIR
+
+ENDPOINT = '/scan_faces'
+EMBEDDING = np.array([0.25, -0.5, 1.0, 0.125])
+LANDMARKS = np.array([[10, 20], [30, 40]])
+
+
+@pytest.fixture
+def client(mocker):
+    from src._endpoints import endpoints
+    from src.app import create_app
+    mocker.patch('src._endpoints.managers')
+    scanner = mocker.patch('src._endpoints.scanner')
+    scanner.ID = 'MockScanner'
+    scanner.scan.return_value = [FaceDTO(box=BoundingBoxDTO(1, 2, 3, 4, 0.9, np_landmarks=LANDMARKS),
+                                         plugins_dto=[EmbeddingDTO(embedding=EMBEDDING)],
+                                         img=None, face_img=None)]
+    return create_app(endpoints).test_client()
+
+
+def _scan_faces(client, embedding_format):
+    with open(IMG_DIR / 'einstein.jpeg', 'rb') as f:
+        data = {'file': (f, 'einstein.jpeg'), 'embedding_format': embedding_format}
+        return client.post(ENDPOINT, data=data, content_type='multipart/form-data')
+
+
+@pytest.mark.parametrize('embedding_format', ['list', 'base64_float32', 'base64_float16'])
+def test__given_embedding_format__when_scanning__then_embedding_round_trips(client, embedding_format):
+    pass  # NOSONAR
+
+    res = _scan_faces(client, embedding_format)
+
+    assert res.status_code == HTTPStatus.OK, res.json
+    embedding = decode_array(res.json['result'][0]['embedding'], embedding_format)
+    assert np.allclose(embedding, EMBEDDING)
+
+
+def test__given_unknown_embedding_format__when_scanning__then_returns_400(client):
+    pass  # NOSONAR
+
+    res = _scan_faces(client, 'base64_float64')
+
+    assert res.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,69 @@
+#  Copyright (c) 2020 the original author or authors
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+#  or implied. See the License for the specific language governing
+#  permissions and limitations under the License.
+
+import numpy as np
+
+# Boxes whose pairwise overlaps are computed together: large enough to amortize numpy calls,
+# small enough that suppressed boxes are dropped before most of their rows are computed
+NMS_BLOCK_SIZE = 16
+
+
+def _overlap(x1, y1, x2, y2, areas, rows, cols, method: str):
+    xx1 = np.maximum(x1[rows, np.newaxis], x1[cols])
+    yy1 = np.maximum(y1[rows, np.newaxis], y1[cols])
+    xx2 = np.minimum(x2[rows, np.newaxis], x2[cols])
+    yy2 = np.minimum(y2[rows, np.newaxis], y2[cols])
+    inter = np.maximum(0.0, xx2 - xx1 + 1) * np.maximum(0.0, yy2 - yy1 + 1)
+    if method == 'Min':
+        return inter / np.minimum(areas[rows, np.newaxis], areas[cols])
+    return inter / (areas[rows, np.newaxis] + areas[cols] - inter)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, threshold: float, method: str = 'Union') -> np.ndarray:
+    """
+    Greedy non-maximum suppression, shared by the MTCNN stages and the RetinaFace detector.
+    Boxes are (x1, y1, x2, y2) with inclusive corners, so a box is (x2 - x1 + 1) pixels wide.
+    :param boxes: (N, 4) boxes
+    :param scores: (N,) box scores
+    :param threshold: boxes overlapping a kept box by more than this are suppressed
+    :param method: 'Union' (IoU) or 'Min' (intersection over the smaller box)
+    :return: indices of the kept boxes, highest score first
+
+    >>> boxes = np.array([[0, 0, 9, 9], [1, 1, 10, 10], [20, 20, 29, 29]])
+    >>> nms(boxes, np.array([0.9, 0.8, 0.7]), 0.5).tolist()
+    [0, 2]
+    >>> nms(boxes, np.array([0.9, 0.8, 0.7]), 0.9).tolist()
+    [0, 1, 2]
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # highest score first, ties broken like the former argsort-and-pop implementation
+    order = np.argsort(scores)[::-1]
+    x1, y1, x2, y2 = np.asarray(boxes, dtype=np.float32)[order, :4].T
+    areas = (x2 - x1 + 1) * (y2 - y1 + 1)
+
+    keep = []
+    candidates = np.arange(len(order))
+    while candidates.size > 0:
+        # overlaps of the next block of candidates with all candidates, as a suppression mask
+        rows = candidates[:NMS_BLOCK_SIZE]
+        suppress = _overlap(x1, y1, x2, y2, areas, rows, candidates, method) > threshold
+        alive = np.ones(candidates.size, dtype=bool)
+        for i in range(rows.size):
+            if alive[i]:
+                keep.append(rows[i])
+                alive[i + 1:] &= ~suppress[i, i + 1:]
+        candidates = candidates[rows.size:][alive[rows.size:]]
+    return order[keep]
@@ -12,12 +12,27 @@
 #  or implied. See the License for the specific language governing
 #  permissions and limitations under the License.
 
+import io
+from pathlib import Path
+from typing import Optional, Tuple
+
+import cv2
 import imageio
 import numpy as np
+from PIL import Image
 
 from src.exceptions import ImageReadLibraryError, OneDimensionalImageIsGivenError
 from src.services.imgtools.types import Array3D
 
+# JPEGs can be decoded directly at 1/2, 1/4 or 1/8 of their size (DCT-domain scaling)
+_IMREAD_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+JPEG_SIGNATURE = b'\xff\xd8'
+
 
 def _grayscale_to_rgb(img):
     """ Source: facenet library, to_rgb() function """
@@ -27,7 +42,29 @@ def _grayscale_to_rgb(img):
     return ret
 
 
-def read_img(file) -> Array3D:
+def _read_bytes(file) -> Optional[bytes]:
+    if isinstance(file, bytes):
+        return file
+    if hasattr(file, 'read'):
+        return file.read()
+    try:
+        return Path(file).read_bytes()
+    except (OSError, TypeError):
+        return None
+
+
+def _jpeg_reduction(data: bytes, min_length: int) -> int:
+    """ Largest JPEG decode reduction that keeps the longest side at least min_length """
+    if not min_length or not data.startswith(JPEG_SIGNATURE):
+        return 1
+    try:
+        length = max(Image.open(io.BytesIO(data)).size)
+    except (OSError, ValueError, SyntaxError):
+        return 1
+    return next((reduction for reduction in (8, 4, 2) if length // reduction >= min_length), 1)
+
+
+def _decode_with_imageio(file) -> Array3D:
     try:
         arr = imageio.imread(file)
     except (ValueError, SyntaxError) as e:
@@ -38,6 +75,29 @@ def read_img(file) -> Array3D:
     elif arr.ndim == 2:
         arr = _grayscale_to_rgb(arr)
     else:
-        arr = arr[:, :, 0:3]
+        arr = np.ascontiguousarray(arr[:, :, 0:3])
 
     return arr
+
+
+def read_img_reduced(file, min_length: int = 0) -> Tuple[Array3D, int]:
+    """
+    Decodes an image into a contiguous RGB array with OpenCV (libjpeg-turbo for JPEGs).
+    A JPEG at least twice as long as min_length is decoded at 1/2, 1/4 or 1/8 of its size,
+    keeping its longest side at least min_length, which skips most of the decoding work.
+    Formats OpenCV can't decode fall back to imageio.
+    :return: image and the reduction it was decoded with (coordinates in it are that many times smaller)
+    """
+    data = _read_bytes(file)
+    if data:
+        reduction = _jpeg_reduction(data, min_length)
+        # keep the stored pixel order like imageio did, don't apply EXIF orientation
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8),
+                           _IMREAD_FLAGS[reduction] | cv2.IMREAD_IGNORE_ORIENTATION)
+        if img is not None:
+            return cv2.cvtColor(img, cv2.COLOR_BGR2RGB), reduction
+    return _decode_with_imageio(data if data is not None else file), 1
+
+
+def read_img(file) -> Array3D:
+    return read_img_reduced(file)[0]
@@ -0,0 +1,51 @@
+#  Copyright (c) 2020 the original author or authors
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+#  or implied. See the License for the specific language governing
+#  permissions and limitations under the License.
+
+import numpy as np
+import pytest
+
+from src.services.imgtools.nms import nms
+
+
+def _reference_nms(boxes, scores, threshold, method):
+    x1, y1, x2, y2 = boxes.T
+    area = (x2 - x1 + 1) * (y2 - y1 + 1)
+    order = np.argsort(scores)
+    keep = []
+    while order.size > 0:
+        i, order = order[-1], order[:-1]
+        keep.append(i)
+        w = np.maximum(0.0, np.minimum(x2[i], x2[order]) - np.maximum(x1[i], x1[order]) + 1)
+        h = np.maximum(0.0, np.minimum(y2[i], y2[order]) - np.maximum(y1[i], y1[order]) + 1)
+        inter = w * h
+        if method == 'Min':
+            overlap = inter / np.minimum(area[i], area[order])
+        else:
+            overlap = inter / (area[i] + area[order] - inter)
+        order = order[overlap <= threshold]
+    return keep
+
+
+@pytest.mark.parametrize('method', ['Union', 'Min'])
+@pytest.mark.parametrize('box_count', [0, 1, 7, 300, 2000])
+def test__given_random_boxes__when_nms__then_keeps_same_boxes_as_reference(method, box_count):
+    rng = np.random.default_rng(box_count)
+    corners = rng.integers(0, 600, (box_count, 2))
+    sides = rng.integers(12, 80, (box_count, 1))
+    boxes = np.hstack([corners, corners + sides]).astype(np.float32)
+    scores = rng.random(box_count)
+
+    actual = nms(boxes, scores, 0.5, method)
+
+    assert actual.tolist() == _reference_nms(boxes, scores, 0.5, method)
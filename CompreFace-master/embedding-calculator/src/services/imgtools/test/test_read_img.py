@@ -18,7 +18,7 @@ import numpy as np
 import pytest
 
 from src.exceptions import OneDimensionalImageIsGivenError, ImageReadLibraryError
-from src.services.imgtools.read_img import read_img
+from src.services.imgtools.read_img import read_img, read_img_reduced
 from src.services.imgtools.test.files import IMG_DIR
 from src.services.utils.pytestutils import raises
 
@@ -90,3 +90,30 @@ def test__given_img__when_read__then_returns_correct_numpy_array(extension, expe
 
     assert actual_array.shape == expected_array.shape
     assert numpy.allclose(actual_array, expected_array, atol=20, rtol=20)
+
+
+def test__given_img_bytes__when_read__then_returns_contiguous_rgb_array(expected_array):
+    img_bytes = (IMG_DIR / 'einstein.jpeg').read_bytes()
+
+    actual_array = read_img(img_bytes)
+
+    assert actual_array.flags['C_CONTIGUOUS']
+    assert numpy.allclose(actual_array, expected_array, atol=20, rtol=20)
+
+
+@pytest.mark.parametrize('min_length, expected_reduction', [(0, 1), (64, 4), (100, 2), (200, 1)])
+def test__given_min_length__when_read_reduced__then_decodes_jpeg_at_reduced_size(min_length, expected_reduction,
+                                                                                   expected_array):
+    img_path = IMG_DIR / 'einstein.jpeg'
+
+    actual_array, reduction = read_img_reduced(img_path, min_length)
+
+    assert reduction == expected_reduction
+    assert actual_array.shape == (256 // reduction, 256 // reduction, 3)
+
+
+def test__given_png__when_read_reduced__then_decodes_at_full_size():
+    actual_array, reduction = read_img_reduced(IMG_DIR / 'einstein.png', 64)
+
+    assert reduction == 1
+    assert actual_array.shape == (256, 256, 3)
@@ -34,6 +34,7 @@ import pkg_resources
 
 from mtcnn.exceptions import InvalidImage
 from mtcnn.network.factory import NetworkFactory
+from src.services.imgtools.nms import nms
 
 __author__ = "Iván de Paz Centeno"
 
@@ -123,10 +124,44 @@ class MTCNN(object):
         im_data = cv2.resize(image, (width_scaled, height_scaled), interpolation=cv2.INTER_AREA)
 
         # Normalize the image's pixels
-        im_data_normalized = (im_data - 127.5) * 0.0078125
+        im_data_normalized = im_data.astype(np.float32)
+        im_data_normalized -= 127.5
+        im_data_normalized *= 0.0078125
 
         return im_data_normalized
 
+    @staticmethod
+    def __pack_pyramid(image, scales: list):
+        """
+        Scales the image to every pyramid level and packs the levels into one canvas (shelf packing),
+        so P-Net runs once per image instead of once per scale.
+
+        Levels are placed at even offsets, so the output of a level is a plain window of the canvas
+        output (P-Net has stride 2). Only the last output row/column of a level with odd size can
+        differ slightly: its 'same' max pooling now sees the neighbouring pixels instead of padding.
+        :param image:
+        :param scales:
+        :return: normalized canvas and a (scale, y, x, height, width) placement per level
+        """
+        levels = [(scale, MTCNN.__scale_image(image, scale)) for scale in scales]
+
+        canvas_width = levels[0][1].shape[1] + levels[0][1].shape[1] % 2
+        placements = []
+        shelf_y = shelf_x = shelf_height = 0
+        for scale, level in levels:
+            height, width, _ = level.shape
+            if shelf_x + width > canvas_width:
+                shelf_y, shelf_x, shelf_height = shelf_y + shelf_height, 0, 0
+            placements.append((scale, shelf_y, shelf_x, height, width))
+            shelf_x += width + width % 2
+            shelf_height = max(shelf_height, height + height % 2)
+
+        canvas = np.zeros((shelf_y + shelf_height, canvas_width, 3), dtype=np.float32)
+        for (_, y, x, height, width), (_, level) in zip(placements, levels):
+            canvas[y:y + height, x:x + width] = level
+
+        return canvas, placements
+
     @staticmethod
     def __generate_bounding_box(imap, reg, scale, t):
         # use heatmap to generate bounding boxes
@@ -172,46 +207,7 @@ class MTCNN(object):
         :param method: NMS method to apply. Available values ('Min', 'Union')
         :return:
         """
-        if boxes.size == 0:
-            return np.empty((0, 3))
-
-        x1 = boxes[:, 0]
-        y1 = boxes[:, 1]
-        x2 = boxes[:, 2]
-        y2 = boxes[:, 3]
-        s = boxes[:, 4]
-
-        area = (x2 - x1 + 1) * (y2 - y1 + 1)
-        sorted_s = np.argsort(s)
-
-        pick = np.zeros_like(s, dtype=np.int16)
-        counter = 0
-        while sorted_s.size > 0:
-            i = sorted_s[-1]
-            pick[counter] = i
-            counter += 1
-            idx = sorted_s[0:-1]
-
-            xx1 = np.maximum(x1[i], x1[idx])
-            yy1 = np.maximum(y1[i], y1[idx])
-            xx2 = np.minimum(x2[i], x2[idx])
-            yy2 = np.minimum(y2[i], y2[idx])
-
-            w = np.maximum(0.0, xx2 - xx1 + 1)
-            h = np.maximum(0.0, yy2 - yy1 + 1)
-
-            inter = w * h
-
-            if method is 'Min':
-                o = inter / np.minimum(area[i], area[idx])
-            else:
-                o = inter / (area[i] + area[idx] - inter)
-
-            sorted_s = sorted_s[np.where(o <= threshold)]
-
-        pick = pick[0:counter]
-
-        return pick
+        return nms(boxes[:, 0:4], boxes[:, 4], threshold, method)
 
     @staticmethod
     def __pad(total_boxes, w, h):
@@ -275,6 +271,43 @@ class MTCNN(object):
         boundingbox[:, 0:4] = np.transpose(np.vstack([b1, b2, b3, b4]))
         return boundingbox
 
+    @staticmethod
+    def __extract_patches(img, stage_status: StageStatus, size: int):
+        """
+        Crops the padded boxes of a stage and resizes them for the next network.
+        The image is zero-padded once so every box is a plain view into it.
+        :param img: image to crop from
+        :param stage_status: boxes as computed by __pad
+        :param size: side of the network input
+        :return: normalized float32 batch (num_boxes, size, size, 3) transposed like the network
+        input, or None if a box is degenerate.
+        """
+        tmpw = np.asarray(stage_status.tmpw, dtype=np.int32)
+        tmph = np.asarray(stage_status.tmph, dtype=np.int32)
+        if np.any(tmpw <= 0) or np.any(tmph <= 0):
+            return None
+
+        # top-left corner of every box in image coordinates (__pad works 1-based)
+        x0 = np.asarray(stage_status.x, dtype=np.int32) - np.asarray(stage_status.dx, dtype=np.int32)
+        y0 = np.asarray(stage_status.y, dtype=np.int32) - np.asarray(stage_status.dy, dtype=np.int32)
+
+        height, width = img.shape[:2]
+        left, top = max(0, -int(x0.min())), max(0, -int(y0.min()))
+        right = max(0, int((x0 + tmpw).max()) - width)
+        bottom = max(0, int((y0 + tmph).max()) - height)
+        padded = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=0) \
+            if top or bottom or left or right else img
+
+        patches = np.empty((len(tmpw), size, size, 3), dtype=np.float32)
+        for k, (x, y, w, h) in enumerate(zip(x0 + left, y0 + top, tmpw, tmph)):
+            patch = padded[y:y + h, x:x + w].astype(np.float32)
+            # the networks take images transposed (width first)
+            patches[k] = cv2.resize(patch, (size, size), interpolation=cv2.INTER_AREA).transpose(1, 0, 2)
+
+        patches -= 127.5
+        patches *= 0.0078125
+        return patches
+
     def detect_faces(self, img) -> list:
         """
         Detects bounding boxes from the specified image.
@@ -333,19 +366,27 @@ class MTCNN(object):
         total_boxes = np.empty((0, 9))
         status = stage_status
 
-        for scale in scales:
-            scaled_image = self.__scale_image(image, scale)
+        if not scales:
+            return total_boxes, status
+
+        canvas, placements = self.__pack_pyramid(image, scales)
 
-            img_x = np.expand_dims(scaled_image, 0)
-            img_y = np.transpose(img_x, (0, 2, 1, 3))
+        img_x = np.expand_dims(canvas, 0)
+        img_y = np.transpose(img_x, (0, 2, 1, 3))
 
-            out = self._pnet(img_y)
+        out = self._pnet(img_y)
 
-            out0 = np.transpose(out[0], (0, 2, 1, 3))
-            out1 = np.transpose(out[1], (0, 2, 1, 3))
+        out0 = np.transpose(out[0], (0, 2, 1, 3))
+        out1 = np.transpose(out[1], (0, 2, 1, 3))
 
-            boxes, _ = self.__generate_bounding_box(out1[0, :, :, 1].copy(),
-                                                    out0[0, :, :, :].copy(), scale, self._steps_threshold[0])
+        for scale, y, x, height, width in placements:
+            # P-Net output window of this level: 'valid' 3x3 conv, 2x2 stride-2 pooling, two 'valid' 3x3 convs
+            oy, ox = y // 2, x // 2
+            out_height, out_width = (height - 1) // 2 - 4, (width - 1) // 2 - 4
+
+            boxes, _ = self.__generate_bounding_box(out1[0, oy:oy + out_height, ox:ox + out_width, 1].copy(),
+                                                    out0[0, oy:oy + out_height, ox:ox + out_width, :].copy(),
+                                                    scale, self._steps_threshold[0])
 
             # inter-scale nms
             pick = self.__nms(boxes.copy(), 0.5, 'Union')
@@ -388,22 +429,9 @@ class MTCNN(object):
             return total_boxes, stage_status
 
         # second stage
-        tempimg = np.zeros(shape=(24, 24, 3, num_boxes))
-
-        for k in range(0, num_boxes):
-            tmp = np.zeros((int(stage_status.tmph[k]), int(stage_status.tmpw[k]), 3))
-
-            tmp[stage_status.dy[k] - 1:stage_status.edy[k], stage_status.dx[k] - 1:stage_status.edx[k], :] = \
-                img[stage_status.y[k] - 1:stage_status.ey[k], stage_status.x[k] - 1:stage_status.ex[k], :]
-
-            if tmp.shape[0] > 0 and tmp.shape[1] > 0 or tmp.shape[0] == 0 and tmp.shape[1] == 0:
-                tempimg[:, :, :, k] = cv2.resize(tmp, (24, 24), interpolation=cv2.INTER_AREA)
-
-            else:
-                return np.empty(shape=(0,)), stage_status
-
-        tempimg = (tempimg - 127.5) * 0.0078125
-        tempimg1 = np.transpose(tempimg, (3, 1, 0, 2))
+        tempimg1 = self.__extract_patches(img, stage_status, 24)
+        if tempimg1 is None:
+            return np.empty(shape=(0,)), stage_status
 
         out = self._rnet(tempimg1)
 
@@ -445,22 +473,9 @@ class MTCNN(object):
         status = StageStatus(self.__pad(total_boxes.copy(), stage_status.width, stage_status.height),
                              width=stage_status.width, height=stage_status.height)
 
-        tempimg = np.zeros((48, 48, 3, num_boxes))
-
-        for k in range(0, num_boxes):
-
-            tmp = np.zeros((int(status.tmph[k]), int(status.tmpw[k]), 3))
-
-            tmp[status.dy[k] - 1:status.edy[k], status.dx[k] - 1:status.edx[k], :] = \
-                img[status.y[k] - 1:status.ey[k], status.x[k] - 1:status.ex[k], :]
-
-            if tmp.shape[0] > 0 and tmp.shape[1] > 0 or tmp.shape[0] == 0 and tmp.shape[1] == 0:
-                tempimg[:, :, :, k] = cv2.resize(tmp, (48, 48), interpolation=cv2.INTER_AREA)
-            else:
-                return np.empty(shape=(0,)), np.empty(shape=(0,))
-
-        tempimg = (tempimg - 127.5) * 0.0078125
-        tempimg1 = np.transpose(tempimg, (3, 1, 0, 2))
+        tempimg1 = self.__extract_patches(img, status, 48)
+        if tempimg1 is None:
+            return np.empty(shape=(0,)), np.empty(shape=(0,))
 
         out = self._onet(tempimg1)
         out0 = np.transpose(out[0])
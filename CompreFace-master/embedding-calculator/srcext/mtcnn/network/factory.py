@@ -23,12 +23,30 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import tensorflow as tf
 from tensorflow.keras.layers import Input, Dense, Conv2D, MaxPooling2D, PReLU, Flatten, Softmax
 from tensorflow.keras.models import Model
 
 import numpy as np
 
 
+def compile_net(net, input_shape):
+    """
+    Wraps a Keras network into a tf.function with a fixed input signature. The batch dimension (and
+    the image size of the fully convolutional P-Net) is left open, so the graph is traced once and
+    reused for every image and pyramid, instead of running the layers eagerly on every call.
+    :param net: Keras model
+    :param input_shape: input shape without the batch dimension
+    :return: function from a float32 batch to the list of numpy outputs
+    """
+    signature = [tf.TensorSpec(shape=(None,) + tuple(input_shape), dtype=tf.float32)]
+    graph_fn = tf.function(lambda batch: net(batch, training=False), input_signature=signature)
+
+    def run(batch):
+        return [output.numpy() for output in graph_fn(tf.convert_to_tensor(batch, dtype=tf.float32))]
+    return run
+
+
 class NetworkFactory:
 
     def build_pnet(self, input_shape=None):
@@ -128,4 +146,6 @@ class NetworkFactory:
         r_net.set_weights(weights['rnet'])
         o_net.set_weights(weights['onet'])
 
-        return p_net, r_net, o_net
+        return (compile_net(p_net, (None, None, 3)),
+                compile_net(r_net, (24, 24, 3)),
+                compile_net(o_net, (48, 48, 3)))
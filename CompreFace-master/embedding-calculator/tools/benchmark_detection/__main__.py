@@ -13,6 +13,7 @@
 #  permissions and limitations under the License.
 
 import logging
+import time
 from collections import namedtuple
 from pathlib import Path
 
@@ -77,10 +78,12 @@ if __name__ == '__main__':
 
         for annotated_image in annotated_images:
             img, noses, img_name = annotated_image.img, annotated_image.noses, annotated_image.img_name
+            start = time.perf_counter()
             boxes = scanner.find_faces(img)
+            seconds = time.perf_counter() - start
             missed_boxes, missed_noses = calculate_missed_boxes(boxes, noses), calculate_missed_noses(boxes, noses)
             simple_stats.add(total_boxes=len(boxes), total_noses=len(noses),
-                             total_missed_boxes=missed_boxes, total_missed_noses=missed_noses)
+                             total_missed_boxes=missed_boxes, total_missed_noses=missed_noses, seconds=seconds)
             if (missed_boxes or missed_noses) and ENV.SAVE_IMG_ON_ERROR:
                 filepath = ERR_IMG_DIR / f'{img_name}_{scanner_name}.png'.replace('/', '_')
                 save_img(img, boxes, noses, filepath)
@@ -22,15 +22,20 @@ class SimpleStats:
     total_missed_boxes: int = 0
     total_noses: int = 0
     total_missed_noses: int = 0
+    total_images: int = 0
+    total_seconds: float = 0.0
 
-    def add(self, total_boxes, total_missed_boxes, total_noses, total_missed_noses):
+    def add(self, total_boxes, total_missed_boxes, total_noses, total_missed_noses, seconds=0.0):
         self.total_boxes += total_boxes
         self.total_missed_boxes += total_missed_boxes
         self.total_noses += total_noses
         self.total_missed_noses += total_missed_noses
+        self.total_images += 1
+        self.total_seconds += seconds
 
     def __str__(self, infix=False):
         infix = f'[{infix}] ' if infix else ""
         return (f"{infix}"
                 f"Undetected faces: {self.total_missed_noses}/{self.total_noses}, "
-                f"False face detections: {self.total_missed_boxes}/{self.total_boxes}")
+                f"False face detections: {self.total_missed_boxes}/{self.total_boxes}, "
+                f"Detection time: {self.total_seconds * 1000 / max(self.total_images, 1):.1f} ms/image")
@@ -20,6 +20,8 @@ import sys
 import smtplib
 from email.message import EmailMessage
 
+from motion_gate import MotionGate
+
 try:
     import face_recognition  # type: ignore
     HAS_FACE_RECOGNITION = True
@@ -77,6 +79,12 @@ ENABLE_SPI_COMPREFACE_BRIDGE = os.getenv("ENABLE_SPI_COMPREFACE_BRIDGE", "false"
 ENABLE_COMPREFACE = os.getenv("ENABLE_COMPREFACE", "false").lower() == "true"
 COMPREFACE_URL = os.getenv("COMPREFACE_URL", "http://localhost:8001")
 
+# Motion gate in front of face detection for /analyze video input
+MOTION_GATE_ENABLED = os.getenv("MOTION_GATE_ENABLED", "false").lower() == "true"
+MOTION_GATE_METHOD = os.getenv("MOTION_GATE_METHOD", "diff")
+MOTION_GATE_SENSITIVITY = float(os.getenv("MOTION_GATE_SENSITIVITY", "0.005"))
+MOTION_GATE_FORCE_SECONDS = float(os.getenv("MOTION_GATE_FORCE_SECONDS", "5"))
+
 
 SMTP_HOST = os.getenv("SMTP_HOST", "")
 SMTP_PORT = os.getenv("SMTP_PORT", "")
@@ -618,7 +626,10 @@ async def analyze(
     authorized_images: List[UploadFile] = File([]),
     unauthorized_images: List[UploadFile] = File([]),
     unauthorized_ids: str = Form(""),
-    unauthorized_image_ids: List[str] = Form([])
+    unauthorized_image_ids: List[str] = Form([]),
+    motion_gate: bool = Form(MOTION_GATE_ENABLED),
+    motion_sensitivity: float = Form(MOTION_GATE_SENSITIVITY),
+    force_detection_seconds: float = Form(MOTION_GATE_FORCE_SECONDS)
 ):
     # Combine authorized and unauthorized images into one list
     all_images = list(authorized_images) if authorized_images else []
@@ -656,10 +667,20 @@ async def analyze(
             
             # Process video
             cap = cv2.VideoCapture(temp_video_path)
+            video_fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
             frame_count = 0
             matches = []
             detection_stats = {}  # Track detections per employee
             
+            # Skip detection on static frames; still detect at least every N seconds
+            gate = None
+            if motion_gate:
+                gate = MotionGate(
+                    method=MOTION_GATE_METHOD,
+                    sensitivity=motion_sensitivity,
+                    force_interval_seconds=force_detection_seconds
+                )
+            
             # Adaptive threshold based on encoding method
             match_threshold = 0.8 if HAS_FACE_RECOGNITION else 1.15
             
@@ -673,6 +694,9 @@ async def analyze(
                 if frame_count % 5 != 0:
                     continue
                 
+                if gate is not None and not gate.should_detect(frame, frame_count / video_fps):
+                    continue
+                
                 # Enhance frame for better detection in low-light/blurred CCTV footage
                 enhanced_frame = enhance_frame_for_detection(frame)
                 
@@ -742,7 +766,8 @@ async def analyze(
                 "matches": matches, 
                 "total_frames": frame_count,
                 "cctv_stats": cctv_stats,
-                "unique_detections": len(detection_stats)
+                "unique_detections": len(detection_stats),
+                "motion_gate": asdict(gate.stats) if gate is not None else None
             }
             
         except Exception as e:
@@ -806,20 +831,26 @@ async def analyze(
 try:
     from compreface_integration import CompreFaceIntegration
     from cctv_video_processor import CCTVVideoProcessor
+    from camera_scheduler import MultiCameraScheduler, CameraConfig
     COMPREFACE_MODULES_AVAILABLE = True
 except ImportError as e:
     print(f"[WARN] CompreFace modules not available: {e}")
     COMPREFACE_MODULES_AVAILABLE = False
     CompreFaceIntegration = None
     CCTVVideoProcessor = None
+    MultiCameraScheduler = None
+    CameraConfig = None
+
+CCTV_SCHEDULER_WORKERS = int(os.getenv("CCTV_SCHEDULER_WORKERS", str(os.cpu_count() or 4)))
 
 # Initialize CompreFace integration
 _compreface_client = None
 _video_processor = None
+_camera_scheduler = None
 
 def _init_compreface():
     """Initialize CompreFace integration"""
-    global _compreface_client, _video_processor
+    global _compreface_client, _video_processor, _camera_scheduler
     
     if not ENABLE_COMPREFACE:
         print("[INFO] CompreFace disabled (set ENABLE_COMPREFACE=true to enable)")
@@ -837,6 +868,10 @@ def _init_compreface():
             if _compreface_client.is_available():
                 print("[OK] CompreFace integration initialized")
                 _video_processor = CCTVVideoProcessor(_compreface_client)
+                _camera_scheduler = MultiCameraScheduler(
+                    _video_processor,
+                    max_workers=CCTV_SCHEDULER_WORKERS
+                )
             else:
                 print("[WARN] CompreFace service not available")
                 _compreface_client = None
@@ -1410,6 +1445,91 @@ async def real_time_face_detection(
         }
 
 
+@app.post("/api/v1/cctv/cameras")
+async def register_cctv_camera(
+    camera_id: str = Form(...),
+    zone: str = Form(None),
+    target_fps: float = Form(5.0),
+    priority: int = Form(1),
+    min_fps: float = Form(0.5)
+):
+    """
+    Register a camera with the multi-camera scheduler
+    
+    Parameters:
+    - camera_id: Unique camera identifier
+    - zone: Monitoring zone covered by the camera
+    - target_fps: Frames per second to analyze when the pool is not saturated
+    - priority: Scheduling weight (higher = larger share, e.g. vault > lobby)
+    - min_fps: Lowest sampling rate the camera may be degraded to
+    """
+    if not _camera_scheduler:
+        return {"error": "Camera scheduler not available"}
+    try:
+        _camera_scheduler.add_camera(CameraConfig(
+            camera_id=camera_id,
+            zone=zone,
+            target_fps=target_fps,
+            priority=priority,
+            min_fps=min_fps
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "registered", "camera_id": camera_id}
+
+
+@app.post("/api/v1/cctv/cameras/{camera_id}/frame")
+async def submit_cctv_camera_frame(camera_id: str, image_file: UploadFile = File(...)):
+    """
+    Submit a frame from a registered camera to the shared detection pool
+    
+    Returns:
+    - accepted: False when the frame was skipped by the camera's FPS budget
+    
+    The analysis runs asynchronously; poll GET /api/v1/cctv/cameras/{camera_id}/result
+    for the latest processed frame's detections.
+    """
+    if not _camera_scheduler:
+        return {"error": "Camera scheduler not available"}
+    
+    content = await image_file.read()
+    frame = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return {"error": "Invalid image format"}
+    
+    try:
+        accepted = _camera_scheduler.submit_frame(camera_id, frame)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown camera: {camera_id}")
+    return {"camera_id": camera_id, "accepted": accepted}
+
+
+@app.get("/api/v1/cctv/cameras/{camera_id}/result")
+async def get_cctv_camera_result(camera_id: str):
+    """
+    Get the detection/recognition result of the camera's latest processed frame
+    
+    Returns:
+    - result: Detections of the frame, or null while no frame has finished yet
+    """
+    if not _camera_scheduler:
+        return {"error": "Camera scheduler not available"}
+    
+    try:
+        result = _camera_scheduler.get_latest_result(camera_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown camera: {camera_id}")
+    return {"camera_id": camera_id, "result": result}
+
+
+@app.get("/api/v1/cctv/scheduler/metrics")
+async def cctv_scheduler_metrics():
+    """Per-camera FPS, lag and drop metrics of the multi-camera scheduler"""
+    if not _camera_scheduler:
+        return {"error": "Camera scheduler not available"}
+    return _camera_scheduler.get_metrics()
+
+
 @app.get("/api/v1/cctv/status")
 async def cctv_system_status():
     """Get status of CCTV monitoring system and CompreFace integration"""
@@ -1429,6 +1549,10 @@ async def cctv_system_status():
             "initialized": _video_processor is not None,
             "available": _video_processor is not None and _compreface_client is not None
         },
+        "camera_scheduler": {
+            "initialized": _camera_scheduler is not None,
+            "max_workers": _camera_scheduler.max_workers if _camera_scheduler else None
+        },
         "features": {
             "face_detection": compreface_available,
             "face_recognition": compreface_available,
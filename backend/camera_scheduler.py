@@ -0,0 +1,394 @@
+"""
+Multi-Camera Scheduling Module for CCTV Monitoring
+Shares one pool of detection/recognition workers between many camera sources
+with per-camera FPS budgets, priorities and adaptive degradation
+"""
+
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CameraConfig:
+    """Static configuration of a camera source"""
+    camera_id: str
+    zone: Optional[str] = None
+    target_fps: float = 5.0
+    priority: int = 1
+    min_fps: float = 0.5
+
+
+@dataclass
+class CameraMetrics:
+    """Runtime metrics of a camera source"""
+    camera_id: str
+    zone: Optional[str]
+    priority: int
+    target_fps: float
+    effective_fps: float
+    degraded: bool = False
+    frames_submitted: int = 0
+    frames_skipped: int = 0
+    frames_dropped: int = 0
+    frames_processed: int = 0
+    frames_failed: int = 0
+    last_lag_ms: float = 0.0
+    avg_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    last_detection_count: int = 0
+
+
+@dataclass
+class _CameraState:
+    """Mutable scheduling state of a camera (guarded by the scheduler lock)"""
+    config: CameraConfig
+    metrics: CameraMetrics
+    effective_fps: float
+    next_due: float = 0.0
+    virtual_time: float = 0.0
+    last_activity: float = field(default_factory=time.monotonic)
+    pending_frame: Optional[np.ndarray] = None
+    pending_captured_at: float = 0.0
+    in_flight: bool = False
+    latest_result: Optional[Dict] = None
+
+
+class MultiCameraScheduler:
+    """
+    Schedule frames from N cameras onto a shared worker pool
+
+    - Each camera is sampled at most at its effective FPS; extra frames are skipped
+    - Each camera has at most one queued frame; a newer frame replaces a stale one
+    - Ready cameras are served by weighted fair queuing (weight = priority), so
+      critical zones get a proportionally larger share and shorter queueing delay
+    - When worker utilization exceeds the saturation threshold, cameras without
+      recent detections are degraded towards their min FPS, lowest priority first
+    """
+
+    LAG_SMOOTHING = 0.2
+    DEGRADE_FACTOR = 0.5
+    RECOVER_FACTOR = 1.5
+    ADJUST_INTERVAL_SECONDS = 1.0
+
+    def __init__(
+        self,
+        video_processor,
+        known_faces_db: Optional[Dict[str, np.ndarray]] = None,
+        risk_scores: Optional[Dict[str, float]] = None,
+        authorized_zones: Optional[Dict[str, List[str]]] = None,
+        max_workers: int = 4,
+        saturation_threshold: float = 0.85,
+        quiet_after_seconds: float = 30.0,
+        result_callback: Optional[Callable[[str, Dict], None]] = None
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            video_processor: CCTVVideoProcessor used for real-time frame analysis
+            known_faces_db: Known employee faces database
+            risk_scores: Employee risk scores
+            authorized_zones: Zones and authorized users
+            max_workers: Size of the shared detection worker pool
+            saturation_threshold: Worker utilization (0-1) above which quiet cameras degrade
+            quiet_after_seconds: Seconds without detections before a camera counts as quiet
+            result_callback: Optional callable(camera_id, result) invoked per processed frame
+        """
+        self.video_processor = video_processor
+        self.known_faces_db = known_faces_db if known_faces_db is not None else {}
+        self.risk_scores = risk_scores if risk_scores is not None else {}
+        self.authorized_zones = authorized_zones
+        self.max_workers = max(1, int(max_workers))
+        self.saturation_threshold = saturation_threshold
+        self.quiet_after_seconds = quiet_after_seconds
+        self.result_callback = result_callback
+
+        self._cameras: Dict[str, _CameraState] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="cctv-camera-worker"
+        )
+        self._in_flight = 0
+        self._busy_seconds = 0.0
+        self._window_started = time.monotonic()
+        self._utilization = 0.0
+        self._closed = False
+
+    def add_camera(self, config: CameraConfig) -> None:
+        """
+        Register a camera source (re-registering updates its configuration)
+
+        Args:
+            config: Camera configuration
+
+        Raises:
+            ValueError: If target_fps, priority or min_fps is out of range
+        """
+        if config.target_fps <= 0:
+            raise ValueError(f"target_fps must be positive for camera {config.camera_id}")
+        if config.priority < 1:
+            raise ValueError(f"priority must be >= 1 for camera {config.camera_id}")
+        if not 0 < config.min_fps <= config.target_fps:
+            raise ValueError(f"min_fps must be in (0, target_fps] for camera {config.camera_id}")
+
+        with self._lock:
+            existing = self._cameras.get(config.camera_id)
+            if existing is not None:
+                existing.config = config
+                existing.effective_fps = config.target_fps
+                existing.metrics.zone = config.zone
+                existing.metrics.priority = config.priority
+                existing.metrics.target_fps = config.target_fps
+                existing.metrics.effective_fps = config.target_fps
+                existing.metrics.degraded = False
+                return
+
+            # New cameras join at the current virtual time so they cannot starve others
+            start_vtime = min((c.virtual_time for c in self._cameras.values()), default=0.0)
+            self._cameras[config.camera_id] = _CameraState(
+                config=config,
+                metrics=CameraMetrics(
+                    camera_id=config.camera_id,
+                    zone=config.zone,
+                    priority=config.priority,
+                    target_fps=config.target_fps,
+                    effective_fps=config.target_fps
+                ),
+                effective_fps=config.target_fps,
+                virtual_time=start_vtime
+            )
+        logger.info(f"Camera registered: {config.camera_id} (zone={config.zone}, "
+                    f"fps={config.target_fps}, priority={config.priority})")
+
+    def remove_camera(self, camera_id: str) -> bool:
+        """
+        Unregister a camera source
+
+        Args:
+            camera_id: Camera identifier
+
+        Returns:
+            True if the camera was registered
+        """
+        with self._lock:
+            return self._cameras.pop(camera_id, None) is not None
+
+    def submit_frame(
+        self,
+        camera_id: str,
+        frame: np.ndarray,
+        captured_at: Optional[float] = None
+    ) -> bool:
+        """
+        Offer a frame from a camera to the scheduler
+
+        Args:
+            camera_id: Camera identifier
+            frame: Video frame (BGR)
+            captured_at: time.monotonic() timestamp of capture (defaults to now)
+
+        Returns:
+            True if the frame was accepted, False if skipped by the FPS budget
+        """
+        now = time.monotonic()
+        if captured_at is None:
+            captured_at = now
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler has been shut down")
+            state = self._cameras.get(camera_id)
+            if state is None:
+                raise KeyError(f"Unknown camera: {camera_id}")
+
+            state.metrics.frames_submitted += 1
+            if now < state.next_due:
+                state.metrics.frames_skipped += 1
+                return False
+
+            state.next_due = now + 1.0 / state.effective_fps
+            if state.pending_frame is not None:
+                state.metrics.frames_dropped += 1
+            state.pending_frame = frame
+            state.pending_captured_at = captured_at
+
+            self._adjust_sampling_locked(now)
+            self._dispatch_locked()
+        return True
+
+    def get_metrics(self) -> Dict:
+        """
+        Get scheduler and per-camera metrics
+
+        Returns:
+            Dictionary with pool utilization and metrics per camera
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'in_flight': self._in_flight,
+                'queued': sum(1 for c in self._cameras.values() if c.pending_frame is not None),
+                'utilization': round(self._utilization, 3),
+                'saturated': self._utilization > self.saturation_threshold,
+                'cameras': {
+                    camera_id: asdict(state.metrics)
+                    for camera_id, state in self._cameras.items()
+                }
+            }
+
+    def get_latest_result(self, camera_id: str) -> Optional[Dict]:
+        """
+        Get the analysis result of the most recently processed frame of a camera
+
+        Args:
+            camera_id: Camera identifier
+
+        Returns:
+            Result of process_real_time_frame, or None before the first frame finished
+
+        Raises:
+            KeyError: If the camera is not registered
+        """
+        with self._lock:
+            return self._cameras[camera_id].latest_result
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting frames and release the worker pool
+
+        Args:
+            wait: Wait for in-flight frames to finish
+        """
+        with self._lock:
+            self._closed = True
+            for state in self._cameras.values():
+                state.pending_frame = None
+        self._executor.shutdown(wait=wait)
+
+    def _dispatch_locked(self) -> None:
+        """Hand ready frames to idle workers in weighted fair order"""
+        while self._in_flight < self.max_workers:
+            ready = [
+                c for c in self._cameras.values()
+                if c.pending_frame is not None and not c.in_flight
+            ]
+            if not ready:
+                return
+
+            state = min(ready, key=lambda c: (c.virtual_time, -c.config.priority))
+            frame, captured_at = state.pending_frame, state.pending_captured_at
+            state.pending_frame = None
+            state.in_flight = True
+            self._in_flight += 1
+            self._executor.submit(self._process, state, frame, captured_at)
+
+    def _process(self, state: _CameraState, frame: np.ndarray, captured_at: float) -> None:
+        """Worker body: analyze one frame and update camera metrics"""
+        started = time.monotonic()
+        result = None
+        try:
+            result = self.video_processor.process_real_time_frame(
+                frame,
+                self.known_faces_db,
+                self.risk_scores,
+                current_zone=state.config.zone,
+                authorized_zones=self.authorized_zones
+            )
+        except Exception as e:
+            logger.error(f"Camera {state.config.camera_id} frame processing error: {e}")
+        finished = time.monotonic()
+
+        with self._lock:
+            service_seconds = finished - started
+            self._busy_seconds += service_seconds
+            self._in_flight -= 1
+            state.in_flight = False
+            state.virtual_time += service_seconds / state.config.priority
+
+            if result is not None:
+                state.latest_result = result
+
+            metrics = state.metrics
+            if result is None or 'error' in result:
+                metrics.frames_failed += 1
+            else:
+                metrics.frames_processed += 1
+                detection_count = len(result.get('detections', []))
+                metrics.last_detection_count = detection_count
+                if detection_count > 0:
+                    state.last_activity = finished
+                    if state.effective_fps < state.config.target_fps:
+                        self._set_effective_fps_locked(state, state.config.target_fps)
+
+            lag_ms = (finished - captured_at) * 1000
+            metrics.last_lag_ms = round(lag_ms, 2)
+            metrics.max_lag_ms = round(max(metrics.max_lag_ms, lag_ms), 2)
+            if metrics.avg_lag_ms == 0.0:
+                metrics.avg_lag_ms = round(lag_ms, 2)
+            else:
+                metrics.avg_lag_ms = round(
+                    metrics.avg_lag_ms + self.LAG_SMOOTHING * (lag_ms - metrics.avg_lag_ms), 2
+                )
+
+            if not self._closed:
+                self._dispatch_locked()
+
+        if result is not None and self.result_callback is not None:
+            try:
+                self.result_callback(state.config.camera_id, result)
+            except Exception as e:
+                logger.error(f"Result callback error for camera {state.config.camera_id}: {e}")
+
+    def _adjust_sampling_locked(self, now: float) -> None:
+        """Degrade quiet cameras under saturation and recover them when load drops"""
+        elapsed = now - self._window_started
+        if elapsed < self.ADJUST_INTERVAL_SECONDS:
+            return
+
+        self._utilization = min(1.0, self._busy_seconds / (elapsed * self.max_workers))
+        self._busy_seconds = 0.0
+        self._window_started = now
+
+        quiet = [
+            c for c in self._cameras.values()
+            if now - c.last_activity >= self.quiet_after_seconds
+        ]
+
+        if self._utilization > self.saturation_threshold:
+            # The lowest priority tier of quiet cameras gives up its budget first
+            degradable = [c for c in quiet if c.effective_fps > c.config.min_fps]
+            if degradable:
+                tier = min(c.config.priority for c in degradable)
+                for state in degradable:
+                    if state.config.priority == tier:
+                        self._set_effective_fps_locked(
+                            state, max(state.config.min_fps, state.effective_fps * self.DEGRADE_FACTOR)
+                        )
+        elif self._utilization < self.saturation_threshold * 0.6:
+            # The highest priority tier recovers first
+            recoverable = [c for c in self._cameras.values() if c.effective_fps < c.config.target_fps]
+            if recoverable:
+                tier = max(c.config.priority for c in recoverable)
+                for state in recoverable:
+                    if state.config.priority == tier:
+                        self._set_effective_fps_locked(
+                            state, min(state.config.target_fps, state.effective_fps * self.RECOVER_FACTOR)
+                        )
+
+    @staticmethod
+    def _set_effective_fps_locked(state: _CameraState, fps: float) -> None:
+        if fps == state.effective_fps:
+            return
+        logger.info(f"Camera {state.config.camera_id}: sampling {state.effective_fps:.2f} -> {fps:.2f} FPS")
+        state.effective_fps = fps
+        state.metrics.effective_fps = round(fps, 3)
+        state.metrics.degraded = fps < state.config.target_fps
@@ -0,0 +1,21 @@
+"""
+Motion Gate Module
+Loads the SPI pipeline's MotionGate from real cctv/motion_gate.py, so the API
+and the offline pipeline share one implementation
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+_MODULE_NAME = "spi_motion_gate"
+_MODULE_PATH = Path(__file__).resolve().parents[1] / "real cctv" / "motion_gate.py"
+
+_spec = importlib.util.spec_from_file_location(_MODULE_NAME, str(_MODULE_PATH))
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[_MODULE_NAME] = _module
+_spec.loader.exec_module(_module)
+
+MOTION_METHODS = _module.MOTION_METHODS
+MotionGate = _module.MotionGate
+MotionGateStats = _module.MotionGateStats
@@ -0,0 +1,28 @@
+"""
+Camera Scheduler Tests
+Camera configuration validation of MultiCameraScheduler
+"""
+
+import pytest
+
+from camera_scheduler import CameraConfig, MultiCameraScheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = MultiCameraScheduler(video_processor=None, max_workers=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+@pytest.mark.parametrize('min_fps', [0.0, -1.0, 5.5])
+def test_add_camera_rejects_min_fps_outside_target_range(scheduler, min_fps):
+    with pytest.raises(ValueError, match="min_fps"):
+        scheduler.add_camera(CameraConfig(camera_id='lobby', target_fps=5.0, min_fps=min_fps))
+    assert 'lobby' not in scheduler.get_metrics()['cameras']
+
+
+@pytest.mark.parametrize('min_fps', [0.5, 5.0])
+def test_add_camera_accepts_min_fps_up_to_target(scheduler, min_fps):
+    scheduler.add_camera(CameraConfig(camera_id='lobby', target_fps=5.0, min_fps=min_fps))
+    assert 'lobby' in scheduler.get_metrics()['cameras']
@@ -0,0 +1,75 @@
+"""
+CCTV Styling Benchmark
+Compares the float-based styling pipeline with the LUT / preallocated-noise
+CCTVStyler on 1080p frames
+"""
+
+import argparse
+import time
+import logging
+
+import cv2
+import numpy as np
+
+from video_processor import CCTVStyler
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def legacy_cctv_style(frame, brightness_adjustment=1.1, contrast_adjustment=1.2):
+    """Former apply_cctv_style implementation (float32 math, float64 noise)"""
+    frame_float = frame.astype(np.float32) / 255.0
+    frame_float = np.clip(frame_float * contrast_adjustment, 0, 1)
+    frame_float = np.clip(frame_float * brightness_adjustment, 0, 1)
+    frame = (frame_float * 255).astype(np.uint8)
+    frame = cv2.GaussianBlur(frame, (3, 3), 0)
+    noise = np.random.normal(0, 2, frame.shape)
+    return np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+
+def time_per_frame(style_fn, frames, repeats):
+    """Average milliseconds per frame over `repeats` passes"""
+    style_fn(frames[0].copy())  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for frame in frames:
+            style_fn(frame)
+    return (time.perf_counter() - start) * 1000 / (repeats * len(frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CCTV frame styling")
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--frames', type=int, default=8)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+              for _ in range(args.frames)]
+
+    styler = CCTVStyler(seed=0)
+
+    # Tone mapping must match the former float pipeline exactly (before blur and noise)
+    lut = styler._get_lut(1.1, 1.2)
+    expected = (np.clip(np.clip(frames[0].astype(np.float32) / 255.0 * 1.2, 0, 1) * 1.1, 0, 1) * 255).astype(np.uint8)
+    if not np.array_equal(cv2.LUT(frames[0], lut), expected):
+        logger.warning("LUT tone mapping differs from the float pipeline")
+
+    legacy_ms = time_per_frame(legacy_cctv_style, frames, args.repeats)
+    copy_ms = time_per_frame(styler.apply, frames, args.repeats)
+    inplace_ms = time_per_frame(lambda f: styler.apply(f, inplace=True), frames, args.repeats)
+
+    logger.info(f"Frame size: {args.width}x{args.height}, {args.frames} frames x {args.repeats} repeats")
+    logger.info(f"  legacy float pipeline : {legacy_ms:8.2f} ms/frame")
+    logger.info(f"  CCTVStyler (copy)     : {copy_ms:8.2f} ms/frame  ({legacy_ms / copy_ms:.1f}x)")
+    logger.info(f"  CCTVStyler (in place) : {inplace_ms:8.2f} ms/frame  ({legacy_ms / inplace_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import shutil
 from pathlib import Path
 import logging
 
+from face_detectors import get_detector
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -18,9 +20,7 @@ def extract_third_face_video5(base_path):
     organized_faces = base_path / "processed_output" / "faces_organized" / "video_5"
     organized_faces.mkdir(parents=True, exist_ok=True)
     
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-    )
+    face_detector = get_detector('haar')
     
     frame_files = sorted(
         list(frames_folder.glob("*.jpg")) + list(frames_folder.glob("*.png"))
@@ -35,14 +35,8 @@ def extract_third_face_video5(base_path):
     frames_with_faces = 0
     
     # Scan frames for additional faces
-    for frame_file in frame_files[50:]:  # Start from a different section
-        frame = cv2.imread(str(frame_file))
-        if frame is None:
-            continue
-        
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(40, 40))
-        
+    # Start from a different section
+    for frame_file, frame, faces in face_detector.detect_files(frame_files[50:], min_size=(40, 40)):
         if len(faces) >= 3 and face_count < 6:  # Get frames with at least 3 faces
             # Take the 3rd face
             x, y, w, h = faces[2]
@@ -6,6 +6,8 @@ import cv2
 from pathlib import Path
 import logging
 
+from face_detectors import get_detector
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -16,9 +18,7 @@ def find_and_extract_multiple_faces(base_path):
     frames_folder = base_path / "processed_output" / "frames" / "video_5"
     organized_faces = base_path / "processed_output" / "faces_organized" / "video_5"
     
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-    )
+    face_detector = get_detector('haar')
     
     frame_files = sorted(
         list(frames_folder.glob("*.jpg")) + list(frames_folder.glob("*.png"))
@@ -28,16 +28,9 @@ def find_and_extract_multiple_faces(base_path):
     
     # Find frames with multiple faces
     best_frames = []
-    for frame_file in frame_files:
-        frame = cv2.imread(str(frame_file))
-        if frame is None:
-            continue
-        
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(40, 40))
-        
+    for frame_file, frame, faces in face_detector.detect_files(frame_files, min_size=(40, 40)):
         if len(faces) >= 3:
-            best_frames.append((frame_file, faces))
+            best_frames.append((frame, faces))
             if len(best_frames) >= 2:
                 break
     
@@ -55,9 +48,7 @@ def find_and_extract_multiple_faces(base_path):
     face3_folder.mkdir(exist_ok=True)
     
     extracted_count = 0
-    for frame_file, faces in best_frames:
-        frame = cv2.imread(str(frame_file))
-        
+    for frame, faces in best_frames:
         # Extract face 3 (index 2)
         if len(faces) > 2:
             x, y, w, h = faces[2]
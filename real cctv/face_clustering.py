@@ -6,18 +6,127 @@ Groups similar faces together to identify unique individuals
 import cv2
 import numpy as np
 import os
+import json
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from sklearn.cluster import DBSCAN
 import logging
 
+from video_writer import StreamingVideoWriter
+
 logger = logging.getLogger(__name__)
 
 
+OUTPUT_MODES = ('hardlink', 'symlink', 'copy', 'manifest')
+
+
+def load_face_images(face_files, max_workers=8):
+    """
+    Decode face images on a thread pool (cv2.imread releases the GIL)
+    
+    Args:
+        face_files: Face image paths
+        max_workers: Decoder threads
+    
+    Returns:
+        List of images in the order of face_files (None where decoding failed)
+    """
+    face_files = list(face_files)
+    if len(face_files) < 2 or max_workers <= 1:
+        return [cv2.imread(str(f)) for f in face_files]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda f: cv2.imread(str(f)), face_files))
+
+
+def place_face_file(source, dest, mode='hardlink'):
+    """
+    Put a face image into an organized folder without duplicating its bytes
+    
+    Falls back to copying when links are not possible (e.g. another drive or
+    a filesystem without link support). An existing destination is replaced
+    unless it already links to source, so re-extracted faces never leave a
+    stale copy or a link to a deleted file behind.
+    
+    Args:
+        source: Extracted face image
+        dest: Path in the organized folder
+        mode: 'hardlink', 'symlink' or 'copy'
+    """
+    if os.path.lexists(dest):
+        if mode != 'copy' and os.path.exists(dest) and os.path.samefile(source, dest):
+            return
+        os.unlink(dest)
+    try:
+        if mode == 'hardlink':
+            os.link(source, dest)
+            return
+        if mode == 'symlink':
+            os.symlink(Path(source).resolve(), dest)
+            return
+    except OSError as e:
+        logger.debug(f"Could not {mode} {source}, copying instead: {e}")
+    shutil.copy(str(source), str(dest))
+
+
+def grid_histogram_features(gray_faces, cell_size=25, bins=16, chunk_size=64):
+    """
+    Compute per-cell intensity histograms for a stack of gray faces
+    
+    Equivalent to one cv2.calcHist per grid cell (row-major cell order,
+    `bins` equal-width bins over 0-255), but done for many faces per bincount.
+    
+    Args:
+        gray_faces: N x H x W uint8 array of gray faces (H, W multiples of cell_size)
+        cell_size: Side length of a grid cell in pixels
+        bins: Histogram bins per cell (must divide 256)
+        chunk_size: Faces per bincount call (keeps the index array cache-sized)
+    
+    Returns:
+        N x (cells * bins) float32 feature matrix
+    """
+    gray_faces = np.asarray(gray_faces, dtype=np.uint8)
+    n, height, width = gray_faces.shape
+    rows, cols = height // cell_size, width // cell_size
+    features_per_face = rows * cols * bins
+    
+    # First feature index of every pixel's grid cell, shared by all faces
+    cell_rows = np.arange(height) // cell_size
+    cell_cols = np.arange(width) // cell_size
+    cell_offset = ((cell_rows[:, None] * cols + cell_cols[None, :]) * bins).astype(np.intp)
+    shift = int(np.log2(256 // bins))
+    
+    features = np.empty((n, features_per_face), dtype=np.float32)
+    for start in range(0, n, chunk_size):
+        chunk = gray_faces[start:start + chunk_size]
+        count = len(chunk)
+        # Feature index of every pixel, offset per face so one bincount covers the chunk
+        index = (chunk >> shift).astype(np.intp)
+        index += cell_offset
+        index += (np.arange(count, dtype=np.intp) * features_per_face)[:, None, None]
+        features[start:start + count] = np.bincount(
+            index.ravel(), minlength=count * features_per_face
+        ).reshape(count, features_per_face)
+    
+    return features
+
+
 class FaceClustering:
     """Cluster faces to group same person from different angles"""
     
-    def __init__(self):
-        """Initialize face clustering with feature extractor"""
+    def __init__(self, load_detector=True):
+        """
+        Initialize face clustering with feature extractor
+        
+        Args:
+            load_detector: Load the OpenCV DNN face detector (not needed for
+                feature extraction and clustering)
+        """
+        self.net = None
+        if not load_detector:
+            return
+        
         # Load pre-trained face detection and embedding model
         try:
             # Use OpenCV's DNN module for face detection
@@ -52,19 +161,8 @@ class FaceClustering:
             gray = cv2.cvtColor(face_resized, cv2.COLOR_BGR2GRAY)
             
             if use_histogram:
-                # Use histogram of gradients for face comparison
-                # Calculate histogram of different regions
-                features = []
-                
-                # Divide into 4x4 grid and calculate histogram for each cell
-                cell_size = 25
-                for i in range(0, 100, cell_size):
-                    for j in range(0, 100, cell_size):
-                        cell = gray[i:i+cell_size, j:j+cell_size]
-                        hist = cv2.calcHist([cell], [0], None, [16], [0, 256])
-                        features.extend(hist.flatten())
-                
-                return np.array(features).flatten()
+                # 16-bin intensity histogram of each cell of a 4x4 grid
+                return grid_histogram_features(gray[None])[0]
             else:
                 # Use simple flattened image features
                 return gray.flatten()
@@ -72,6 +170,40 @@ class FaceClustering:
             logger.debug(f"Error extracting features: {e}")
             return None
     
+    def extract_face_features_batch(self, face_images):
+        """
+        Extract grid-histogram features from many face images at once
+        
+        Args:
+            face_images: List of face images (BGR)
+        
+        Returns:
+            Tuple of (N x 256 float32 feature matrix, indices of the faces it covers)
+        """
+        gray_stack = np.empty((len(face_images), 100, 100), dtype=np.uint8)
+        valid_indices = []
+        
+        for idx, face_image in enumerate(face_images):
+            if face_image is None or face_image.shape[0] < 10 or face_image.shape[1] < 10:
+                continue
+            gray = gray_stack[len(valid_indices)]
+            try:
+                face_resized = cv2.resize(face_image, (100, 100))
+                if face_resized.ndim == 2:
+                    gray[:] = face_resized
+                elif face_resized.shape[2] == 4:
+                    cv2.cvtColor(face_resized, cv2.COLOR_BGRA2GRAY, dst=gray)
+                else:
+                    cv2.cvtColor(face_resized, cv2.COLOR_BGR2GRAY, dst=gray)
+            except (cv2.error, ValueError) as e:
+                # A single unreadable crop is skipped, not the whole batch
+                logger.debug(f"Skipping face {idx}: {e}")
+                continue
+            valid_indices.append(idx)
+        
+        features = grid_histogram_features(gray_stack[:len(valid_indices)])
+        return features, valid_indices
+    
     def compute_face_distance(self, features1, features2):
         """
         Compute distance between two face feature vectors
@@ -94,7 +226,34 @@ class FaceClustering:
         distance = 1 - np.dot(f1, f2)
         return distance
     
-    def cluster_faces(self, face_images, eps=0.15, min_samples=1):
+    def compute_distance_matrix(self, features_matrix, chunk_size=2048):
+        """
+        Compute pairwise cosine distances between all face feature vectors
+        
+        Args:
+            features_matrix: N x D matrix of face features
+            chunk_size: Rows per block of the matrix product (bounds temporary memory)
+        
+        Returns:
+            N x N float32 distance matrix (0 on the diagonal, lower = more similar)
+        """
+        # Normalize every vector once instead of once per pair
+        features = normalize_features(features_matrix)
+        
+        n = len(features)
+        distances = np.empty((n, n), dtype=np.float32)
+        for start in range(0, n, chunk_size):
+            end = min(start + chunk_size, n)
+            block = distances[start:end]
+            np.dot(features[start:end], features.T, out=block)
+            np.subtract(1.0, block, out=block)
+        
+        # Rounding can leave tiny negative values, which DBSCAN rejects
+        np.clip(distances, 0.0, None, out=distances)
+        np.fill_diagonal(distances, 0.0)
+        return distances
+    
+    def cluster_faces(self, face_images, eps=0.15, min_samples=1, max_dense=5000):
         """
         Cluster faces using DBSCAN based on feature similarity
         
@@ -102,6 +261,8 @@ class FaceClustering:
             face_images: List of face images (BGR)
             eps: Distance threshold for clustering
             min_samples: Minimum samples in cluster
+            max_dense: Above this many faces, use a neighbour index instead of
+                a dense N x N distance matrix
         
         Returns:
             Cluster labels for each face
@@ -110,36 +271,27 @@ class FaceClustering:
             return np.array([])
         
         # Extract features from all faces
-        features_list = []
-        valid_indices = []
-        
-        for idx, face_img in enumerate(face_images):
-            features = self.extract_face_features(face_img)
-            if features is not None:
-                features_list.append(features)
-                valid_indices.append(idx)
+        features_matrix, valid_indices = self.extract_face_features_batch(face_images)
         
-        if len(features_list) == 0:
+        if len(valid_indices) == 0:
             return np.zeros(len(face_images), dtype=int)
         
-        # Stack features into matrix
-        features_matrix = np.array(features_list)
-        
-        # Compute pairwise distances
-        distances = np.zeros((len(features_list), len(features_list)))
-        for i in range(len(features_list)):
-            for j in range(i+1, len(features_list)):
-                dist = self.compute_face_distance(features_list[i], features_list[j])
-                distances[i, j] = dist
-                distances[j, i] = dist
-        
         # Cluster using DBSCAN
         try:
-            clustering = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed')
-            labels = clustering.fit_predict(distances)
+            if len(features_matrix) <= max_dense:
+                # Compute pairwise distances as one blocked matrix product
+                distances = self.compute_distance_matrix(features_matrix)
+                clustering = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed')
+                labels = clustering.fit_predict(distances)
+            else:
+                # For unit vectors, cosine distance d maps to euclidean sqrt(2d), so a
+                # ball tree radius search finds the same neighbours without an N x N matrix
+                clustering = DBSCAN(eps=np.sqrt(2 * eps), min_samples=min_samples,
+                                    metric='euclidean', algorithm='ball_tree')
+                labels = clustering.fit_predict(normalize_features(features_matrix))
         except Exception as e:
             logger.warning(f"DBSCAN clustering failed: {e}, using single cluster")
-            labels = np.zeros(len(features_list), dtype=int)
+            labels = np.zeros(len(valid_indices), dtype=int)
         
         # Map back to original indices
         final_labels = -np.ones(len(face_images), dtype=int)
@@ -165,12 +317,11 @@ class FaceClustering:
             return {}
         
         # Load all face images
-        face_files = list(face_folder.glob("*.jpg")) + list(face_folder.glob("*.png"))
+        face_files = sorted(list(face_folder.glob("*.jpg")) + list(face_folder.glob("*.png")))
         face_images = []
         valid_files = []
         
-        for face_file in sorted(face_files):
-            img = cv2.imread(str(face_file))
+        for face_file, img in zip(face_files, load_face_images(face_files)):
             if img is not None:
                 face_images.append(img)
                 valid_files.append(face_file)
@@ -192,20 +343,394 @@ class FaceClustering:
         logger.info(f"Clustered {len(face_images)} faces into {len(set(labels))} groups")
         
         return clusters
+    
+    def cluster_new_faces(self, video_folder_path, clusterer):
+        """
+        Cluster faces of a folder that the clusterer has not seen yet
+        
+        Faces whose file changed since they were clustered (e.g. re-extracted
+        under the same name) or that no longer exist are first removed from
+        the cluster state, so they are clustered again as new faces.
+        
+        Args:
+            video_folder_path: Path to folder with extracted faces
+            clusterer: IncrementalFaceClusterer holding the folder's cluster state
+        
+        Returns:
+            Dictionary mapping cluster IDs to newly assigned face image paths
+        """
+        face_folder = Path(video_folder_path)
+        if not face_folder.exists():
+            logger.warning(f"Folder not found: {face_folder}")
+            return {}
+        
+        face_files = sorted(list(face_folder.glob("*.jpg")) + list(face_folder.glob("*.png")))
+        signatures = {f.name: face_file_signature(f) for f in face_files}
+        clusterer.prune(signatures)
+        
+        new_files = [f for f in face_files if not clusterer.is_known(f.name, signatures[f.name])]
+        if len(new_files) == 0:
+            logger.info(f"No new faces in {face_folder}")
+            return {}
+        
+        face_images = load_face_images(new_files)
+        features_matrix, valid_indices = self.extract_face_features_batch(face_images)
+        
+        clusters = {}
+        clustered_files = [new_files[idx] for idx in valid_indices]
+        if clustered_files:
+            labels = clusterer.assign(features_matrix, [f.name for f in clustered_files],
+                                      [signatures[f.name] for f in clustered_files])
+            for face_file, label in zip(clustered_files, labels):
+                clusters.setdefault(int(label), []).append(face_file)
+        
+        # Unusable faces are recorded too, so they are not retried every run
+        for idx in sorted(set(range(len(new_files))) - set(valid_indices)):
+            clusterer.mark_unusable(new_files[idx].name, signatures[new_files[idx].name])
+            clusters.setdefault(-1, []).append(new_files[idx])
+        
+        logger.info(f"Clustered {len(new_files)} new faces into {len(clusters)} groups "
+                    f"({clusterer.num_clusters} clusters in total)")
+        
+        return clusters
+
+
+def face_file_signature(face_file):
+    """
+    Identify the current content of a face file by its size and modification time
+    
+    Face names are deterministic (face_v{N}_f{frame}_{idx}.jpg), so a re-extracted
+    face reuses the name of the crop it replaces; the signature tells them apart.
+    """
+    stat = Path(face_file).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def normalize_features(features_matrix):
+    """
+    L2-normalize face feature vectors
+    
+    Args:
+        features_matrix: N x D matrix of face features
+    
+    Returns:
+        N x D float32 matrix of unit vectors
+    """
+    features = np.asarray(features_matrix, dtype=np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / (norms + 1e-8)
+
+
+class IncrementalFaceClusterer:
+    """
+    Leader-follower face clustering with persistent state
+    
+    Each face joins the nearest cluster centroid within `eps` cosine distance,
+    or starts a new cluster. Centroids, counts and the assigned faces (key,
+    file signature and feature vector) are saved, so later runs only cluster
+    newly extracted faces and keep existing cluster IDs stable, while faces
+    that changed or disappeared can be taken back out of their clusters.
+    """
+    
+    def __init__(self, eps=0.15, state_path=None, chunk_size=1024, max_clusters=None):
+        """
+        Initialize the clusterer, loading saved state if present
+        
+        Args:
+            eps: Cosine distance threshold for joining a cluster
+            state_path: .npz file for persisted cluster state (None = in memory only)
+            chunk_size: Faces compared against the centroids per matrix product
+            max_clusters: Stop creating clusters at this count; faces that match
+                no cluster afterwards get label -1
+        """
+        self.eps = eps
+        self.max_clusters = max_clusters
+        self.state_path = Path(state_path) if state_path is not None else None
+        self.chunk_size = chunk_size
+        
+        self._sums = None  # K x D sums of member unit vectors
+        self._counts = np.zeros(0, dtype=np.int64)
+        self.assignments = {}  # face key -> cluster id
+        self._signatures = {}  # face key -> file signature when it was assigned
+        self._features = {}  # face key -> unit feature vector added to its centroid
+        
+        if self.state_path is not None and self.state_path.exists():
+            self.load()
+    
+    @property
+    def num_clusters(self):
+        """Number of clusters created so far"""
+        return len(self._counts)
+    
+    def is_known(self, key, signature=None):
+        """
+        Check whether a face was already assigned in this or an earlier run
+        
+        Args:
+            key: Face key (e.g. file name)
+            signature: Current file signature; a face assigned with another
+                signature counts as unknown
+        """
+        if key not in self.assignments:
+            return False
+        return signature is None or self._signatures.get(key) == signature
+    
+    def mark_unusable(self, key, signature=None):
+        """Record a face that could not be clustered, so it is not retried"""
+        self.forget([key])
+        self.assignments[key] = -1
+        self._signatures[key] = signature
+    
+    def forget(self, keys):
+        """
+        Remove faces from the state and take them out of their cluster centroids
+        
+        Cluster IDs stay stable; a cluster whose faces are all removed stays
+        empty and is never matched again.
+        
+        Args:
+            keys: Face keys to remove (unknown keys are ignored)
+        
+        Returns:
+            Dictionary of removed face keys to their former cluster IDs
+        """
+        removed = {}
+        for key in keys:
+            if key not in self.assignments:
+                continue
+            label = self.assignments.pop(key)
+            self._signatures.pop(key, None)
+            feature = self._features.pop(key, None)
+            if label >= 0 and feature is not None:
+                self._counts[label] -= 1
+                if self._counts[label] > 0:
+                    self._sums[label] -= feature
+                else:
+                    self._sums[label] = 0.0
+            removed[key] = label
+        return removed
+    
+    def prune(self, current_signatures):
+        """
+        Forget faces that no longer exist or whose file changed since assignment
+        
+        Args:
+            current_signatures: Dictionary of face keys to current file signatures
+        
+        Returns:
+            Dictionary of removed face keys to their former cluster IDs
+        """
+        stale = [
+            key for key in self.assignments
+            if current_signatures.get(key) is None or current_signatures[key] != self._signatures.get(key)
+        ]
+        removed = self.forget(stale)
+        if removed:
+            logger.info(f"Removed {len(removed)} changed or deleted faces from the cluster state")
+        return removed
+    
+    def centroids(self):
+        """
+        Get the unit-length cluster centroids
+        
+        Returns:
+            K x D float32 matrix (None before the first face is assigned)
+        """
+        if self._sums is None:
+            return None
+        return normalize_features(self._sums)
+    
+    def assign(self, features_matrix, keys, signatures=None):
+        """
+        Assign new faces to existing clusters or start new ones
+        
+        Args:
+            features_matrix: N x D matrix of face features
+            keys: N face keys (e.g. file names) used to skip faces on later runs
+            signatures: Optional N file signatures (see face_file_signature)
+        
+        Returns:
+            Array of N cluster IDs (-1 for faces left out by max_clusters)
+        """
+        # A reassigned key first leaves its previous cluster
+        self.forget(keys)
+        features = normalize_features(features_matrix)
+        labels = np.empty(len(features), dtype=int)
+        if self._sums is None and len(features) > 0:
+            self._sums = np.zeros((0, features.shape[1]), dtype=np.float32)
+        
+        for start in range(0, len(features), self.chunk_size):
+            chunk = features[start:start + self.chunk_size]
+            chunk_labels = labels[start:start + self.chunk_size]
+            chunk_labels[:] = -1
+            
+            # Compare the whole chunk with the existing centroids at once
+            if self.num_clusters > 0:
+                similarity = chunk @ self.centroids().T
+                best = similarity.argmax(axis=1)
+                matched = 1.0 - similarity[np.arange(len(chunk)), best] <= self.eps
+                chunk_labels[matched] = best[matched]
+            
+            # Faces matching no centroid are led/followed within the chunk
+            first_new = self.num_clusters
+            new_sums = []
+            for i in np.flatnonzero(chunk_labels < 0):
+                if new_sums:
+                    leaders = normalize_features(new_sums)
+                    similarity = leaders @ chunk[i]
+                    best = int(similarity.argmax())
+                    if 1.0 - similarity[best] <= self.eps:
+                        new_sums[best] = new_sums[best] + chunk[i]
+                        chunk_labels[i] = first_new + best
+                        continue
+                if self.max_clusters is not None and first_new + len(new_sums) >= self.max_clusters:
+                    continue
+                new_sums.append(chunk[i].copy())
+                chunk_labels[i] = first_new + len(new_sums) - 1
+            
+            # Update centroid sums of existing clusters, then append the new ones
+            existing = (chunk_labels >= 0) & (chunk_labels < first_new)
+            np.add.at(self._sums, chunk_labels[existing], chunk[existing])
+            if new_sums:
+                self._sums = np.vstack([self._sums, np.array(new_sums, dtype=np.float32)])
+            counts = np.bincount(chunk_labels[chunk_labels >= 0], minlength=len(self._sums))
+            counts[:len(self._counts)] += self._counts
+            self._counts = counts
+        
+        if signatures is None:
+            signatures = [None] * len(keys)
+        for key, signature, feature, label in zip(keys, signatures, features, labels):
+            self.assignments[key] = int(label)
+            self._signatures[key] = signature
+            if label >= 0:
+                self._features[key] = feature
+        
+        return labels
+    
+    def load(self):
+        """Load cluster state from state_path"""
+        state = np.load(self.state_path)
+        if 'signatures' not in state.files:
+            # Older state has no per-face signatures or features to prune with
+            logger.warning(f"Ignoring cluster state without face signatures: {self.state_path}")
+            return
+        self._counts = state['counts'].astype(np.int64)
+        self._sums = state['sums'].astype(np.float32) if len(self._counts) else None
+        keys = state['keys'].tolist()
+        labels = state['labels'].tolist()
+        self.assignments = dict(zip(keys, labels))
+        self._signatures = {key: signature or None for key, signature in zip(keys, state['signatures'].tolist())}
+        self._features = {
+            key: feature for key, label, feature in zip(keys, labels, state['features']) if label >= 0
+        }
+        logger.info(f"Loaded {self.num_clusters} clusters ({len(self.assignments)} faces) "
+                    f"from {self.state_path}")
+    
+    def save(self):
+        """Save cluster state to state_path"""
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        sums = self._sums if self._sums is not None else np.zeros((0, 0), dtype=np.float32)
+        keys = list(self.assignments.keys())
+        # Rows of unusable faces stay zero; they belong to no centroid
+        features = np.zeros((len(keys), sums.shape[1]), dtype=np.float32)
+        for row, key in enumerate(keys):
+            if key in self._features:
+                features[row] = self._features[key]
+        # Write under a temporary name first so an interrupted run keeps the old state
+        tmp_path = self.state_path.with_name(self.state_path.stem + '.tmp.npz')
+        np.savez(
+            tmp_path,
+            sums=sums,
+            counts=self._counts,
+            keys=np.array(keys, dtype=str),
+            labels=np.array([self.assignments[key] for key in keys], dtype=np.int64),
+            signatures=np.array([self._signatures.get(key) or '' for key in keys], dtype=str),
+            features=features
+        )
+        os.replace(tmp_path, self.state_path)
+
+
+class FaceIdentityCollector:
+    """
+    Assign face crops seen across frames to identities
+    
+    All crops of a frame are embedded in one batch and matched against the
+    matrix of identity centroids, so the work per frame does not grow with
+    the number of faces seen before.
+    """
+    
+    def __init__(self, max_identities, eps=0.15, max_crops=10):
+        """
+        Initialize the collector
+        
+        Args:
+            max_identities: Number of distinct people to collect
+            eps: Cosine distance threshold for matching an identity
+            max_crops: Crops kept per identity
+        """
+        self.max_crops = max_crops
+        self.clustering = FaceClustering(load_detector=False)
+        self.clusterer = IncrementalFaceClusterer(eps=eps, max_clusters=max_identities)
+        self.identities = {}  # identity id -> {'frames': [...], 'crops': [...], 'size': (w, h)}
+    
+    def add_frame(self, frame_file, face_crops):
+        """
+        Assign the face crops of one frame
+        
+        Args:
+            frame_file: Frame the crops come from
+            face_crops: List of face crops (BGR)
+        
+        Returns:
+            Identity id per crop (-1 if unusable or no identity slot left)
+        """
+        labels = -np.ones(len(face_crops), dtype=int)
+        features, valid_indices = self.clustering.extract_face_features_batch(face_crops)
+        if len(valid_indices) == 0:
+            return labels
+        
+        keys = [f"{Path(frame_file).name}#{idx}" for idx in valid_indices]
+        labels[valid_indices] = self.clusterer.assign(features, keys)
+        
+        for idx in valid_indices:
+            label = int(labels[idx])
+            if label < 0:
+                continue
+            crop = face_crops[idx]
+            identity = self.identities.setdefault(
+                label, {'frames': [], 'crops': [], 'size': (crop.shape[1], crop.shape[0])}
+            )
+            if len(identity['crops']) < self.max_crops:
+                identity['frames'].append(frame_file)
+                identity['crops'].append(crop)
+        
+        return labels
 
 
 class CCTVVideoGenerator:
     """Generate CCTV-styled video files from frames"""
     
     @staticmethod
-    def generate_video_from_frames(frames_folder, output_video_path, fps=5.0):
+    def _frame_number(frame_file):
+        """Frame index from a name like frame_000123.jpg (0 if there is none)"""
+        suffix = frame_file.stem.rsplit('_', 1)[-1]
+        return int(suffix) if suffix.isdigit() else 0
+    
+    @staticmethod
+    def generate_video_from_frames(frames_folder, output_video_path, fps=5.0, prefetch_workers=4):
         """
         Generate video from extracted frames
         
+        JPEGs are decoded ahead on a thread pool while a writer thread encodes,
+        so decoding and encoding overlap.
+        
         Args:
             frames_folder: Folder containing frame images
             output_video_path: Output video file path
             fps: Frame rate for output video
+            prefetch_workers: Decoder threads (also the number of frames decoded ahead)
         
         Returns:
             True if successful
@@ -215,53 +740,72 @@ class CCTVVideoGenerator:
         # Get all frames
         frame_files = sorted(
             list(frames_folder.glob("*.jpg")) + list(frames_folder.glob("*.png")),
-            key=lambda x: int(x.stem.split('_')[-1]) if x.stem.split('_')[-1].isdigit() else 0
+            key=CCTVVideoGenerator._frame_number
         )
         
         if len(frame_files) == 0:
             logger.warning(f"No frames found in {frames_folder}")
             return False
         
-        # Read first frame to get dimensions
-        first_frame = cv2.imread(str(frame_files[0]))
-        if first_frame is None:
-            logger.error("Could not read first frame")
-            return False
-        
-        height, width = first_frame.shape[:2]
-        
-        # Create video writer
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        out = cv2.VideoWriter(str(output_video_path), fourcc, fps, (width, height))
+        writer = StreamingVideoWriter(output_video_path, fps=fps)
+        prefetch = max(1, prefetch_workers) * 2
         
-        if not out.isOpened():
-            logger.error("Failed to create video writer")
+        with ThreadPoolExecutor(max_workers=max(1, prefetch_workers)) as executor:
+            pending = deque()
+            files = iter(frame_files)
+            for frame_file in files:
+                pending.append(executor.submit(cv2.imread, str(frame_file)))
+                if len(pending) >= prefetch:
+                    break
+            
+            # Hand frames to the writer in order, keeping `prefetch` decodes in flight
+            while pending:
+                if writer.failed:
+                    # No point decoding the rest; drop the reads that have not started
+                    for future in pending:
+                        future.cancel()
+                    break
+                frame = pending.popleft().result()
+                next_file = next(files, None)
+                if next_file is not None:
+                    pending.append(executor.submit(cv2.imread, str(next_file)))
+                if frame is not None:
+                    writer.write(frame)
+        
+        if not writer.close():
+            logger.error(f"Could not write video: {output_video_path}")
             return False
         
-        # Write frames
-        frames_written = 0
-        for frame_file in frame_files:
-            frame = cv2.imread(str(frame_file))
-            if frame is not None:
-                out.write(frame)
-                frames_written += 1
-        
-        out.release()
-        
-        logger.info(f"[OK] Generated video: {output_video_path} ({frames_written} frames)")
+        logger.info(f"[OK] Generated video: {output_video_path} ({writer.frames_written} frames)")
         return True
 
 
-def reorganize_faces_by_cluster(base_path):
+def cluster_folder_name(cluster_id):
+    """Person folder of a cluster ID (-1 = faces that could not be clustered)"""
+    return "face_unknown" if cluster_id == -1 else f"face_{cluster_id + 1}"
+
+
+def reorganize_faces_by_cluster(base_path, eps=0.15, output_mode='hardlink'):
     """
     Reorganize extracted faces by clustering similar faces together
     
+    Cluster state is kept per video under metadata/face_clusters, so a rerun
+    only clusters and places faces extracted since the previous run.
+    
     Args:
         base_path: Base project path
+        eps: Cosine distance threshold for joining a cluster
+        output_mode: 'hardlink' or 'symlink' (person folders link to the extracted
+            faces), 'copy' (duplicate the files) or 'manifest' (only write
+            clusters.json per video, mapping person folders to face paths)
     """
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode '{output_mode}', expected one of {OUTPUT_MODES}")
+    
     base_path = Path(base_path)
     extracted_faces_folder = base_path / "processed_output" / "extracted_faces"
     organized_folder = base_path / "processed_output" / "faces_organized_by_person"
+    state_folder = base_path / "processed_output" / "metadata" / "face_clusters"
     
     organized_folder.mkdir(parents=True, exist_ok=True)
     
@@ -275,41 +819,63 @@ def reorganize_faces_by_cluster(base_path):
         video_name = video_folder.name
         logger.info(f"\nProcessing {video_name}...")
         
-        # Cluster faces in this video
-        clusters = clustering.cluster_faces_by_folder(video_folder, eps=0.15)
+        # Take changed or deleted faces out of the state and the person folders
+        clusterer = IncrementalFaceClusterer(eps=eps, state_path=state_folder / f"{video_name}.npz")
+        face_files = list(video_folder.glob("*.jpg")) + list(video_folder.glob("*.png"))
+        removed = clusterer.prune({f.name: face_file_signature(f) for f in face_files})
+        
+        # Cluster the faces added to this video since the last run
+        clusters = clustering.cluster_new_faces(video_folder, clusterer)
         
         # Create organized structure
         video_output = organized_folder / video_name
         video_output.mkdir(exist_ok=True)
         
-        # Copy faces to person-specific folders
-        import shutil
+        manifest_file = video_output / "clusters.json"
+        manifest = {}
+        if output_mode == 'manifest' and manifest_file.exists():
+            with open(manifest_file, 'r') as f:
+                manifest = json.load(f)
+        
+        for face_name, cluster_id in removed.items():
+            cluster_name = cluster_folder_name(cluster_id)
+            if output_mode == 'manifest':
+                if cluster_name in manifest:
+                    manifest[cluster_name] = [p for p in manifest[cluster_name] if Path(p).name != face_name]
+            elif os.path.lexists(video_output / cluster_name / face_name):
+                os.unlink(video_output / cluster_name / face_name)
+        
+        # Place faces into person-specific folders
         for cluster_id, face_files in sorted(clusters.items()):
-            # Determine if cluster ID is noise (-1) or valid cluster
-            if cluster_id == -1:
-                cluster_name = f"face_unknown"
-            else:
-                cluster_name = f"face_{cluster_id + 1}"
+            cluster_name = cluster_folder_name(cluster_id)
             
-            face_folder = video_output / cluster_name
-            face_folder.mkdir(exist_ok=True)
-            
-            # Copy all faces in this cluster
-            for face_file in face_files:
-                dest_file = face_folder / face_file.name
-                shutil.copy(str(face_file), str(dest_file))
+            if output_mode == 'manifest':
+                manifest.setdefault(cluster_name, []).extend(str(f) for f in face_files)
+            else:
+                face_folder = video_output / cluster_name
+                face_folder.mkdir(exist_ok=True)
+                for face_file in face_files:
+                    place_face_file(face_file, face_folder / face_file.name, output_mode)
             
-            logger.info(f"  [OK] {cluster_name}: {len(face_files)} face images")
+            logger.info(f"  [OK] {cluster_name}: {len(face_files)} new face images")
+        
+        if output_mode == 'manifest' and (clusters or removed):
+            with open(manifest_file, 'w') as f:
+                json.dump(manifest, f, indent=2)
         
-        logger.info(f"[OK] {video_name}: Organized into {len(clusters)} unique faces")
+        # Saved only after placing, so an interrupted run retries these faces
+        clusterer.save()
+        
+        logger.info(f"[OK] {video_name}: {clusterer.num_clusters} unique faces")
 
 
-def generate_all_cctv_videos(base_path):
+def generate_all_cctv_videos(base_path, max_parallel_videos=2):
     """
     Generate CCTV-styled videos from extracted frames
     
     Args:
         base_path: Base project path
+        max_parallel_videos: Videos generated concurrently
     """
     base_path = Path(base_path)
     frames_folder = base_path / "processed_output" / "frames"
@@ -319,11 +885,9 @@ def generate_all_cctv_videos(base_path):
     
     logger.info("\nGenerating CCTV-styled videos from frames...")
     
-    # Generate video for each video source
-    for video_source_folder in sorted(frames_folder.iterdir()):
-        if not video_source_folder.is_dir():
-            continue
-        
+    video_source_folders = [f for f in sorted(frames_folder.iterdir()) if f.is_dir()]
+    
+    def generate(video_source_folder):
         video_name = video_source_folder.name  # e.g., "video_2"
         output_video = videos_folder / f"{video_name}_cctv_styled.mp4"
         
@@ -338,6 +902,10 @@ def generate_all_cctv_videos(base_path):
             logger.info(f"[OK] {output_video}")
         else:
             logger.error(f"[FAILED] Could not generate {output_video}")
+    
+    # Encoding runs in OpenCV without the GIL, so videos are generated side by side
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel_videos)) as executor:
+        list(executor.map(generate, video_source_folders))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,282 @@
+"""
+Shared Face Detector Module
+Loads each face detection model once per process and exposes a common
+detect / detect_batch API over Haar, MediaPipe, MTCNN and OpenCV DNN backends
+"""
+
+import sys
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_detectors = {}
+_detectors_lock = threading.Lock()
+
+
+def _as_boxes(boxes):
+    """Detections as an N x 4 int array of (x, y, w, h)"""
+    if len(boxes) == 0:
+        return np.zeros((0, 4), dtype=int)
+    return np.asarray(boxes, dtype=int).reshape(-1, 4)
+
+
+def _filter_min_size(boxes, min_size):
+    if min_size is None or len(boxes) == 0:
+        return boxes
+    keep = (boxes[:, 2] >= min_size[0]) & (boxes[:, 3] >= min_size[1])
+    return boxes[keep]
+
+
+class FaceDetector:
+    """Common interface of all detector backends"""
+
+    def detect(self, frame, min_size=(30, 30)):
+        """
+        Detect faces in a frame
+
+        Args:
+            frame: Input frame (BGR)
+            min_size: Minimum face (width, height) in pixels
+
+        Returns:
+            N x 4 int array of face boxes (x, y, w, h)
+        """
+        raise NotImplementedError
+
+    def detect_batch(self, frames, min_size=(30, 30)):
+        """
+        Detect faces in several frames
+
+        Args:
+            frames: List of input frames (BGR)
+            min_size: Minimum face (width, height) in pixels
+
+        Returns:
+            List of N x 4 face box arrays, one per frame
+        """
+        return [self.detect(frame, min_size) for frame in frames]
+
+    def detect_files(self, frame_files, min_size=(30, 30), batch_size=8, read_workers=4):
+        """
+        Read and detect frames from disk, decoding the next batch while detecting
+
+        Args:
+            frame_files: Frame image paths
+            min_size: Minimum face (width, height) in pixels
+            batch_size: Frames per detect_batch call
+            read_workers: Decoder threads
+
+        Yields:
+            (frame_file, frame, faces) for every readable frame, in order
+        """
+        frame_files = list(frame_files)
+        batches = [frame_files[i:i + batch_size] for i in range(0, len(frame_files), batch_size)]
+
+        # Decode tasks are submitted from this thread only: a task that waited on
+        # other tasks of the same pool would deadlock with read_workers=1
+        with ThreadPoolExecutor(max_workers=max(1, read_workers)) as executor:
+            def submit_batch(batch):
+                return [executor.submit(cv2.imread, str(f)) for f in batch]
+
+            pending = submit_batch(batches[0]) if batches else None
+            for batch_idx, batch in enumerate(batches):
+                frames = [future.result() for future in pending]
+                if batch_idx + 1 < len(batches):
+                    pending = submit_batch(batches[batch_idx + 1])
+
+                readable = [(f, frame) for f, frame in zip(batch, frames) if frame is not None]
+                results = self.detect_batch([frame for _, frame in readable], min_size)
+                for (frame_file, frame), faces in zip(readable, results):
+                    yield frame_file, frame, faces
+
+
+class HaarDetector(FaceDetector):
+    """OpenCV Haar cascade detector"""
+
+    def __init__(self, cascade='haarcascade_frontalface_default.xml', scale_factor=1.1, min_neighbors=5):
+        """
+        Load the cascade XML once
+
+        Args:
+            cascade: Cascade file name in cv2.data.haarcascades, or a full path
+            scale_factor: detectMultiScale scale step
+            min_neighbors: detectMultiScale neighbour threshold
+        """
+        cascade_path = Path(cascade)
+        if not cascade_path.exists():
+            cascade_path = Path(cv2.data.haarcascades) / cascade
+        self.cascade = cv2.CascadeClassifier(str(cascade_path))
+        if self.cascade.empty():
+            raise FileNotFoundError(f"Could not load Haar cascade: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self._lock = threading.Lock()
+
+    def detect(self, frame, min_size=(30, 30)):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        # The cascade keeps per-call state, so calls from threads are serialized
+        with self._lock:
+            faces = self.cascade.detectMultiScale(
+                gray, self.scale_factor, self.min_neighbors, minSize=tuple(min_size or (0, 0))
+            )
+        return _as_boxes(faces)
+
+
+class MediaPipeDetector(FaceDetector):
+    """MediaPipe BlazeFace detector (tasks API)"""
+
+    def __init__(self, model_path, min_confidence=0.5, min_suppression=0.3):
+        """
+        Create the MediaPipe detector once
+
+        Args:
+            model_path: Path of blaze_face_short_range.tflite
+            min_confidence: Minimum detection confidence
+            min_suppression: Non-maximum suppression threshold
+        """
+        import mediapipe as mp
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
+
+        self._mp = mp
+        base_options = python.BaseOptions(model_asset_path=str(model_path))
+        options = vision.FaceDetectorOptions(
+            base_options=base_options,
+            min_detection_confidence=min_confidence,
+            min_suppression_threshold=min_suppression
+        )
+        self.detector = vision.FaceDetector.create_from_options(options)
+        self._lock = threading.Lock()
+
+    def detect(self, frame, min_size=(30, 30)):
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        mp_image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=frame_rgb)
+        with self._lock:
+            result = self.detector.detect(mp_image)
+
+        height, width = frame.shape[:2]
+        boxes = []
+        for detection in result.detections:
+            bbox = detection.bounding_box
+            x, y = max(0, int(bbox.origin_x)), max(0, int(bbox.origin_y))
+            w, h = min(int(bbox.width), width - x), min(int(bbox.height), height - y)
+            if w > 0 and h > 0:
+                boxes.append((x, y, w, h))
+        return _filter_min_size(_as_boxes(boxes), min_size)
+
+
+class MTCNNDetector(FaceDetector):
+    """CompreFace's vendored MTCNN detector"""
+
+    def __init__(self, compreface_path, min_confidence=0.9):
+        """
+        Build the MTCNN networks once
+
+        Args:
+            compreface_path: Path to CompreFace master directory
+            min_confidence: Minimum detection confidence
+        """
+        # The vendored package imports itself as 'mtcnn' and uses src.services.imgtools
+        embedding_calculator_path = Path(compreface_path) / "embedding-calculator"
+        for path in (str(embedding_calculator_path), str(embedding_calculator_path / "srcext")):
+            if path not in sys.path:
+                sys.path.insert(0, path)
+        from mtcnn.mtcnn import MTCNN
+
+        self.mtcnn = MTCNN()
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+
+    def detect(self, frame, min_size=(30, 30)):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with self._lock:
+            detections = self.mtcnn.detect_faces(rgb)
+        boxes = [d['box'] for d in detections if d['confidence'] >= self.min_confidence]
+        boxes = _as_boxes(boxes)
+        if len(boxes):
+            boxes[:, :2] = np.maximum(boxes[:, :2], 0)
+        return _filter_min_size(boxes, min_size)
+
+
+class DNNDetector(FaceDetector):
+    """OpenCV DNN SSD face detector (res10 Caffe or TensorFlow model)"""
+
+    def __init__(self, model_path, config_path, min_confidence=0.7, input_size=(300, 300)):
+        """
+        Load the network once
+
+        Args:
+            model_path: .caffemodel or .pb weights
+            config_path: .prototxt or .pbtxt network description
+            min_confidence: Minimum detection confidence
+            input_size: Network input (width, height)
+        """
+        if str(model_path).endswith('.pb'):
+            self.net = cv2.dnn.readNetFromTensorflow(str(model_path), str(config_path))
+        else:
+            self.net = cv2.dnn.readNetFromCaffe(str(config_path), str(model_path))
+        self.min_confidence = min_confidence
+        self.input_size = tuple(input_size)
+        self._lock = threading.Lock()
+
+    def detect(self, frame, min_size=(30, 30)):
+        return self.detect_batch([frame], min_size)[0]
+
+    def detect_batch(self, frames, min_size=(30, 30)):
+        if len(frames) == 0:
+            return []
+
+        # One forward pass for the whole batch
+        blob = cv2.dnn.blobFromImages(frames, 1.0, self.input_size, (104.0, 177.0, 123.0))
+        with self._lock:
+            self.net.setInput(blob)
+            detections = self.net.forward()[0, 0]  # rows: image_id, class, score, x1, y1, x2, y2
+
+        results = []
+        for image_idx, frame in enumerate(frames):
+            height, width = frame.shape[:2]
+            rows = detections[(detections[:, 0] == image_idx) & (detections[:, 2] >= self.min_confidence)]
+            corners = np.clip(rows[:, 3:7], 0, 1) * [width, height, width, height]
+            boxes = np.column_stack([corners[:, :2], corners[:, 2:] - corners[:, :2]])
+            results.append(_filter_min_size(_as_boxes(boxes.astype(int)), min_size))
+        return results
+
+
+DETECTOR_BACKENDS = {
+    'haar': HaarDetector,
+    'mediapipe': MediaPipeDetector,
+    'mtcnn': MTCNNDetector,
+    'dnn': DNNDetector,
+}
+
+
+def get_detector(backend='haar', **options):
+    """
+    Get a detector, loading its model only on the first request in this process
+
+    Args:
+        backend: 'haar', 'mediapipe', 'mtcnn' or 'dnn'
+        **options: Backend constructor arguments (model paths, thresholds)
+
+    Returns:
+        Shared FaceDetector instance for this backend and options
+    """
+    if backend not in DETECTOR_BACKENDS:
+        raise ValueError(f"Unknown detector backend '{backend}', expected one of {list(DETECTOR_BACKENDS)}")
+
+    key = (backend, tuple(sorted((name, str(value)) for name, value in options.items())))
+    detector = _detectors.get(key)
+    if detector is None:
+        with _detectors_lock:
+            detector = _detectors.get(key)
+            if detector is None:
+                detector = DETECTOR_BACKENDS[backend](**options)
+                _detectors[key] = detector
+                logger.info(f"[OK] {backend} face detector loaded")
+    return detector
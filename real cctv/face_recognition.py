@@ -5,7 +5,9 @@ Uses CompreFace for advanced face detection and embedding generation
 
 import numpy as np
 import cv2
+import os
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 from datetime import datetime
@@ -13,6 +15,56 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 
+def score_face_image(face_file, downscale=False):
+    """
+    Read a face image once and measure everything the database needs
+    
+    Args:
+        face_file: Face image path
+        downscale: Decode straight to a half-size gray image (much faster for
+            JPEGs; sharpness is measured at half resolution, so scores are approximate)
+    
+    Returns:
+        Dictionary with width, height, sharpness, brightness, contrast and
+        combined quality (None if the image cannot be read)
+    """
+    if downscale:
+        gray = cv2.imread(str(face_file), cv2.IMREAD_REDUCED_GRAYSCALE_2)
+        if gray is None:
+            return None
+        height, width = gray.shape[0] * 2, gray.shape[1] * 2
+    else:
+        img = cv2.imread(str(face_file))
+        if img is None:
+            return None
+        height, width = img.shape[:2]
+        
+        # Convert to grayscale
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    
+    # Sharpness (Laplacian variance), brightness and contrast
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    mean, std = cv2.meanStdDev(gray)
+    brightness = mean[0, 0] / 255.0
+    contrast = std[0, 0] / 255.0
+    
+    # Combined quality score
+    quality = (
+        min(sharpness / 100, 1.0) * 0.4 +  # Sharpness weight
+        min(max(brightness - 0.2, 0), 0.8) * 0.3 +  # Brightness weight
+        min(contrast, 1.0) * 0.3  # Contrast weight
+    )
+    
+    return {
+        'width': int(width),
+        'height': int(height),
+        'sharpness': float(sharpness),
+        'brightness': float(brightness),
+        'contrast': float(contrast),
+        'quality': float(min(quality, 1.0))
+    }
+
+
 class CompreFaceIntegration:
     """Integrate with CompreFace for face detection and embeddings"""
     
@@ -95,13 +147,18 @@ class CompreFaceIntegration:
 class EmployeeFaceDatabase:
     """Organize and manage employee face database for recognition"""
     
-    def __init__(self, base_path, compreface_path=None):
+    # Below this many uncached faces, a process pool costs more than it saves
+    MIN_FACES_FOR_POOL = 64
+    
+    def __init__(self, base_path, compreface_path=None, quality_workers=None, downscale_quality=False):
         """
         Initialize employee face database
         
         Args:
             base_path: Base directory for the project
             compreface_path: Path to CompreFace installation
+            quality_workers: Processes for face quality scoring (default: CPU count)
+            downscale_quality: Score faces on half-size gray decodes (faster, approximate)
         """
         self.base_path = Path(base_path)
         self.compreface_path = Path(compreface_path) if compreface_path else self.base_path / "CompreFace-master"
@@ -109,6 +166,9 @@ class EmployeeFaceDatabase:
         self.faces_folder = self.output_base / "extracted_faces"
         self.employee_db = self.output_base / "employee_database"
         self.metadata_folder = self.output_base / "metadata"
+        self.quality_cache_file = self.metadata_folder / "face_quality_cache.json"
+        self.quality_workers = quality_workers or os.cpu_count() or 1
+        self.downscale_quality = downscale_quality
         
         self._create_directories()
     
@@ -129,6 +189,8 @@ class EmployeeFaceDatabase:
         logger.info("Organizing extracted faces...")
         
         video_face_stats = {}
+        quality_cache = self._load_quality_cache()
+        current_keys = set()  # faces seen this run; everything else is dropped on save
         
         # Iterate through each video's faces
         for video_folder in self.faces_folder.iterdir():
@@ -138,10 +200,13 @@ class EmployeeFaceDatabase:
             video_name = video_folder.name
             face_files = list(video_folder.glob("*.jpg")) + list(video_folder.glob("*.png"))
             
+            # Score every face once; size and quality come from the same read
+            face_metrics = self._score_faces(face_files, quality_cache, current_keys)
+            
             # Calculate statistics
             total_faces = len(face_files)
-            avg_size = self._calculate_average_face_size(face_files)
-            quality_scores = self._calculate_face_quality(face_files)
+            avg_size = self._calculate_average_face_size(face_metrics)
+            quality_scores = {name: m['quality'] for name, m in face_metrics.items()}
             
             video_face_stats[video_name] = {
                 'total_faces': total_faces,
@@ -155,68 +220,101 @@ class EmployeeFaceDatabase:
             logger.info(f"  - High quality faces: {video_face_stats[video_name]['high_quality_count']}")
             
             # Create employee-ready folder for this video
-            self._create_employee_folder_structure(video_folder)
+            self._create_employee_folder_structure(video_folder, face_files, quality_scores)
+        
+        self._save_quality_cache(
+            {key: entry for key, entry in quality_cache.items() if key in current_keys}
+        )
         
         # Save statistics
         self._save_statistics(video_face_stats)
     
-    def _calculate_average_face_size(self, face_files):
-        """Calculate average face image size"""
-        sizes = []
+    def _load_quality_cache(self):
+        """Load cached face metrics (path -> mtime and metrics) from earlier runs"""
+        if not self.quality_cache_file.exists():
+            return {}
+        try:
+            with open(self.quality_cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable quality cache {self.quality_cache_file}: {e}")
+            return {}
+    
+    def _save_quality_cache(self, quality_cache):
+        """
+        Save face metrics so the next run only scores new or changed faces
         
-        for face_file in face_files[:min(100, len(face_files))]:  # Sample first 100
-            try:
-                img = cv2.imread(str(face_file))
-                if img is not None:
-                    sizes.append(img.shape[:2])
-            except:
-                pass
-        
-        if sizes:
-            avg_h = np.mean([s[0] for s in sizes])
-            avg_w = np.mean([s[1] for s in sizes])
-            return (avg_w, avg_h)
-        return (0, 0)
+        Callers pass only the entries of faces found in the current run, so
+        deleted or re-extracted faces do not accumulate across runs.
+        """
+        tmp_file = self.quality_cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(quality_cache, f)
+        os.replace(tmp_file, self.quality_cache_file)
     
-    def _calculate_face_quality(self, face_files):
+    def _score_faces(self, face_files, quality_cache, current_keys=None):
         """
-        Calculate quality score for each face
-        Based on: sharpness, brightness, contrast
+        Get size and quality metrics of all faces, scoring only uncached ones
+        
+        Args:
+            face_files: Face image paths
+            quality_cache: Cache dictionary (updated in place)
+            current_keys: Optional set collecting the cache keys of existing faces
+        
+        Returns:
+            Dictionary mapping face file name to its metrics
         """
-        quality_scores = {}
+        face_metrics = {}
+        to_score = []
         
-        for face_file in face_files[:min(200, len(face_files))]:  # Sample
+        for face_file in face_files:
+            key = str(face_file)
             try:
-                img = cv2.imread(str(face_file))
-                if img is None:
-                    continue
-                
-                # Convert to grayscale
-                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                
-                # Calculate sharpness (using Laplacian variance)
-                sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
-                
-                # Calculate brightness
-                brightness = np.mean(gray) / 255.0
-                
-                # Calculate contrast
-                contrast = np.std(gray) / 255.0
-                
-                # Combined quality score
-                quality = (
-                    min(sharpness / 100, 1.0) * 0.4 +  # Sharpness weight
-                    min(max(brightness - 0.2, 0), 0.8) * 0.3 +  # Brightness weight
-                    min(contrast, 1.0) * 0.3  # Contrast weight
-                )
-                
-                quality_scores[face_file.name] = min(quality, 1.0)
-            except:
-                pass
+                mtime = face_file.stat().st_mtime_ns
+            except OSError:
+                continue
+            if current_keys is not None:
+                current_keys.add(key)
+            
+            cached = quality_cache.get(key)
+            if (cached is not None and cached['mtime'] == mtime
+                    and cached.get('downscaled', False) == self.downscale_quality):
+                face_metrics[face_file.name] = cached['metrics']
+            else:
+                to_score.append((face_file, mtime))
+        
+        cached_count = len(face_metrics)
+        paths = [str(face_file) for face_file, _ in to_score]
+        downscale = [self.downscale_quality] * len(paths)
+        if self.quality_workers > 1 and len(paths) >= self.MIN_FACES_FOR_POOL:
+            chunksize = max(1, len(paths) // (self.quality_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.quality_workers) as executor:
+                results = list(executor.map(score_face_image, paths, downscale, chunksize=chunksize))
+        else:
+            results = list(map(score_face_image, paths, downscale))
+        
+        for (face_file, mtime), metrics in zip(to_score, results):
+            if metrics is None:
+                continue
+            quality_cache[str(face_file)] = {
+                'mtime': mtime,
+                'downscaled': self.downscale_quality,
+                'metrics': metrics
+            }
+            face_metrics[face_file.name] = metrics
         
-        return quality_scores
+        logger.info(f"  - Scored {len(to_score)} faces, {cached_count} from cache")
+        return face_metrics
     
-    def _create_employee_folder_structure(self, video_folder):
+    def _calculate_average_face_size(self, face_metrics):
+        """Calculate average face image size from scored faces"""
+        if face_metrics:
+            avg_h = np.mean([m['height'] for m in face_metrics.values()])
+            avg_w = np.mean([m['width'] for m in face_metrics.values()])
+            return (avg_w, avg_h)
+        return (0, 0)
+    
+    def _create_employee_folder_structure(self, video_folder, face_files, quality_scores):
         """
         Create folder structure for employee identification
         Separates high-quality and medium-quality faces
@@ -231,9 +329,6 @@ class EmployeeFaceDatabase:
         (video_employee_db / "all_faces").mkdir(exist_ok=True)
         
         # Copy and organize faces
-        face_files = list(video_folder.glob("*.jpg")) + list(video_folder.glob("*.png"))
-        quality_scores = self._calculate_face_quality(face_files)
-        
         for face_file in face_files:
             try:
                 # Copy to all_faces
@@ -8,6 +8,9 @@ import shutil
 from pathlib import Path
 import logging
 
+from face_clustering import FaceIdentityCollector
+from face_detectors import get_detector
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -65,9 +68,7 @@ def extract_best_faces_from_frames(base_path):
     
     logger.info("\nExtracting faces from frames for videos 4 and 5...")
     
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-    )
+    face_detector = get_detector('haar')
     
     for video_num in [4, 5]:
         frames_folder = frames_base / f"video_{video_num}"
@@ -85,19 +86,13 @@ def extract_best_faces_from_frames(base_path):
             list(frames_folder.glob("*.jpg")) + list(frames_folder.glob("*.png"))
         )
         
-        unique_faces = {}  # face_id -> {frames: [], crops: []}
+        # Crops of each frame are matched to identities by nearest centroid
+        collector = FaceIdentityCollector(max_identities=3 if video_num == 5 else 2)
         
         # Scan frames and collect distinct faces
-        for frame_idx, frame_file in enumerate(frame_files):
-            frame = cv2.imread(str(frame_file))
-            if frame is None:
-                continue
-            
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(40, 40))
-            
-            # For each face in this frame, assign to unique person
-            for face_idx, (x, y, w, h) in enumerate(faces):
+        for frame_file, frame, faces in face_detector.detect_files(frame_files, min_size=(40, 40)):
+            face_crops = []
+            for (x, y, w, h) in faces:
                 # Extract face crop
                 padding = 20
                 y1 = max(0, y - padding)
@@ -109,27 +104,12 @@ def extract_best_faces_from_frames(base_path):
                 
                 if face_crop.shape[0] < 30 or face_crop.shape[1] < 30:
                     continue
-                
-                # Assign to a unique face ID based on what's available
-                # Try to assign to existing face or create new
-                assigned = False
-                
-                # For first occurrence, create face folders
-                if len(unique_faces) < (3 if video_num == 5 else 2):
-                    if face_idx not in unique_faces:
-                        unique_faces[face_idx] = {
-                            'frames': [],
-                            'crops': []
-                        }
-                    
-                    unique_faces[face_idx]['frames'].append(frame_file)
-                    unique_faces[face_idx]['crops'].append(face_crop)
-                    assigned = True
-                
-                # If assigned and we're collecting first N angles, continue
-                if assigned:
-                    if len(unique_faces[face_idx]['crops']) > 10:
-                        unique_faces[face_idx]['crops'] = unique_faces[face_idx]['crops'][:10]
+                face_crops.append(face_crop)
+            
+            if face_crops:
+                collector.add_frame(frame_file, face_crops)
+        
+        unique_faces = collector.identities
         
         # Save organized faces
         for face_id in sorted(unique_faces.keys()):
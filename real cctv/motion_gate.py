@@ -0,0 +1,142 @@
+"""
+Motion Gate Module
+Cheap motion check on a downscaled grayscale frame that decides whether
+full face detection needs to run on a sampled CCTV frame
+
+Shared by the offline pipeline and the backend API (backend/motion_gate.py
+loads this file), so both gate frames identically
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MOTION_METHODS = ("diff", "mog2")
+
+
+@dataclass
+class MotionGateStats:
+    """Counters of gate decisions"""
+    frames_seen: int = 0
+    frames_with_motion: int = 0
+    frames_forced: int = 0
+    frames_skipped: int = 0
+
+
+class MotionGate:
+    """
+    Gate face detection on motion
+
+    A frame passes the gate when the fraction of changed pixels on a downscaled
+    gray copy exceeds `sensitivity`, or when `force_interval_seconds` have passed
+    since the last frame that passed (so a person standing still is re-checked).
+    """
+
+    def __init__(
+        self,
+        method: str = "diff",
+        sensitivity: float = 0.005,
+        pixel_threshold: int = 25,
+        downscale_width: int = 160,
+        force_interval_seconds: float = 5.0
+    ):
+        """
+        Initialize the motion gate
+
+        Args:
+            method: 'diff' (frame differencing) or 'mog2' (MOG2 background subtraction)
+            sensitivity: Minimum fraction (0-1) of changed pixels that counts as motion
+            pixel_threshold: Minimum gray-level change of a pixel for frame differencing
+            downscale_width: Width of the gray frame the check runs on
+            force_interval_seconds: Force a detection after this many seconds without one
+        """
+        if method not in MOTION_METHODS:
+            raise ValueError(f"Unknown motion method '{method}', expected one of {MOTION_METHODS}")
+
+        self.method = method
+        self.sensitivity = sensitivity
+        self.pixel_threshold = pixel_threshold
+        self.downscale_width = downscale_width
+        self.force_interval_seconds = force_interval_seconds
+        self.stats = MotionGateStats()
+
+        self._previous: Optional[np.ndarray] = None
+        self._last_detection_time: Optional[float] = None
+        self._subtractor = None
+        if method == "mog2":
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                history=500, varThreshold=16, detectShadows=False
+            )
+
+    def reset(self) -> None:
+        """Forget the background model, e.g. when switching to another video"""
+        self._previous = None
+        self._last_detection_time = None
+        if self._subtractor is not None:
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                history=500, varThreshold=16, detectShadows=False
+            )
+
+    def motion_ratio(self, frame: np.ndarray) -> float:
+        """
+        Update the background model with a frame
+
+        Args:
+            frame: Input frame (BGR or gray)
+
+        Returns:
+            Fraction of pixels (0-1) that changed compared to the background
+        """
+        small = self._downscale_gray(frame)
+
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(small)
+            return cv2.countNonZero(mask) / mask.size
+
+        previous, self._previous = self._previous, small
+        if previous is None or previous.shape != small.shape:
+            return 1.0
+
+        diff = cv2.absdiff(small, previous)
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(mask) / mask.size
+
+    def should_detect(self, frame: np.ndarray, timestamp: float) -> bool:
+        """
+        Decide whether face detection should run on a frame
+
+        Args:
+            frame: Input frame (BGR or gray)
+            timestamp: Frame time in seconds (video time or wall clock)
+
+        Returns:
+            True if the frame has motion or a forced detection is due
+        """
+        self.stats.frames_seen += 1
+        ratio = self.motion_ratio(frame)
+
+        if ratio >= self.sensitivity:
+            self.stats.frames_with_motion += 1
+        elif (self._last_detection_time is None
+              or timestamp - self._last_detection_time >= self.force_interval_seconds):
+            self.stats.frames_forced += 1
+        else:
+            self.stats.frames_skipped += 1
+            return False
+
+        self._last_detection_time = timestamp
+        return True
+
+    def _downscale_gray(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        height, width = gray.shape[:2]
+        if width > self.downscale_width:
+            new_height = max(1, int(height * self.downscale_width / width))
+            gray = cv2.resize(gray, (self.downscale_width, new_height), interpolation=cv2.INTER_AREA)
+        # Suppress sensor noise so it does not register as motion
+        return cv2.GaussianBlur(gray, (5, 5), 0)
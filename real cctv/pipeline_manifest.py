@@ -0,0 +1,172 @@
+"""
+Pipeline Manifest Module
+Records which videos and stages of the SPI pipeline are complete, so reruns
+only process new or changed videos and a crashed run resumes where it stopped
+"""
+
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+
+
+def quick_file_hash(file_path, sample_bytes=1 << 20):
+    """
+    Hash a large file from its size and three sampled blocks
+
+    Reading whole multi-GB videos would take longer than the check saves;
+    size plus head, middle and tail blocks identifies re-exported or replaced
+    footage reliably.
+
+    Args:
+        file_path: File to hash
+        sample_bytes: Bytes read at each sample position
+
+    Returns:
+        Hex digest
+    """
+    file_path = Path(file_path)
+    size = file_path.stat().st_size
+    digest = hashlib.sha256(str(size).encode())
+
+    with open(file_path, 'rb') as f:
+        for offset in (0, max(0, size // 2 - sample_bytes // 2), max(0, size - sample_bytes)):
+            f.seek(offset)
+            digest.update(f.read(sample_bytes))
+
+    return digest.hexdigest()
+
+
+def fingerprint(data):
+    """Stable hash of a JSON-serializable value (e.g. a stage's inputs)"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class PipelineManifest:
+    """JSON manifest of processed videos and completed pipeline stages"""
+
+    def __init__(self, manifest_path):
+        """
+        Load the manifest (a missing or unreadable file starts empty)
+
+        Args:
+            manifest_path: JSON file holding the manifest
+        """
+        self.manifest_path = Path(manifest_path)
+        self.data = {'videos': {}, 'stages': {}}
+
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    self.data = json.load(f)
+                self.data.setdefault('videos', {})
+                self.data.setdefault('stages', {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+
+    def save(self):
+        """Write the manifest atomically, so a crash never leaves it half written"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def video_content_hash(self, video_path):
+        """
+        Get a video's content hash, reusing the recorded one while size and mtime match
+
+        Args:
+            video_path: Video file
+
+        Returns:
+            Hex digest
+        """
+        video_path = Path(video_path)
+        stat = video_path.stat()
+        entry = self.data['videos'].get(str(video_path), {})
+        if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            return entry['content_hash']
+        return quick_file_hash(video_path)
+
+    def video_is_current(self, video_path, config):
+        """
+        Check whether a video was fully processed with the same content and config
+
+        Args:
+            video_path: Video file
+            config: Processing configuration (frame interval, detector settings, ...)
+
+        Returns:
+            True if the recorded outputs are still valid
+        """
+        entry = self.data['videos'].get(str(video_path))
+        if entry is None or entry.get('status') != STATUS_DONE:
+            return False
+        if entry.get('config') != config:
+            return False
+        if not all(Path(p).exists() for p in entry.get('outputs', {}).values()):
+            return False
+        return entry.get('content_hash') == self.video_content_hash(video_path)
+
+    def mark_video_running(self, video_path, config, outputs):
+        """
+        Record that a video is being processed (a crash leaves it incomplete)
+
+        Args:
+            video_path: Video file
+            config: Processing configuration
+            outputs: Output folders of the video by name
+        """
+        video_path = Path(video_path)
+        stat = video_path.stat()
+        self.data['videos'][str(video_path)] = {
+            'content_hash': self.video_content_hash(video_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'config': config,
+            'outputs': {name: str(path) for name, path in outputs.items()},
+            'status': STATUS_RUNNING,
+            'started_at': datetime.now().isoformat()
+        }
+        self.save()
+
+    def mark_video_done(self, video_path, stats):
+        """
+        Record that a video finished processing
+
+        Args:
+            video_path: Video file
+            stats: Processing statistics to keep with the entry
+        """
+        entry = self.data['videos'][str(video_path)]
+        entry['status'] = STATUS_DONE
+        entry['stats'] = stats
+        entry['completed_at'] = datetime.now().isoformat()
+        self.save()
+
+    def video_entries(self):
+        """Recorded video entries by path"""
+        return self.data['videos']
+
+    def stage_is_current(self, stage, inputs_fingerprint):
+        """Check whether a stage completed for exactly these inputs"""
+        entry = self.data['stages'].get(stage)
+        return (entry is not None and entry.get('status') == STATUS_DONE
+                and entry.get('inputs') == inputs_fingerprint)
+
+    def mark_stage_done(self, stage, inputs_fingerprint):
+        """Record that a stage completed for these inputs"""
+        self.data['stages'][stage] = {
+            'status': STATUS_DONE,
+            'inputs': inputs_fingerprint,
+            'completed_at': datetime.now().isoformat()
+        }
+        self.save()
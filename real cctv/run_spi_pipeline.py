@@ -4,6 +4,9 @@ Master orchestration script for processing CCTV videos and extracting faces
 """
 
 import sys
+import json
+import time
+import shutil
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -19,6 +22,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Videos processed by the pipeline and the settings their outputs depend on;
+# changing any of these reprocesses the affected videos on the next run
+VIDEO_NUMS = range(2, 6)
+VIDEO_CONFIG = {
+    'frame_interval': 5,
+    'detector': 'mediapipe/blaze_face_short_range',
+    'min_detection_confidence': 0.9,
+    'motion_gate': False,
+    'motion_sensitivity': 0.005,
+    'force_detection_seconds': 5.0,
+}
+
 
 def print_banner():
     """Print SPI banner"""
@@ -59,6 +74,49 @@ def check_dependencies():
     return True
 
 
+def write_pipeline_report(metadata_folder, video_results, stage_seconds, total_seconds):
+    """
+    Log and save the per-video and per-stage timing report
+    
+    Args:
+        metadata_folder: Folder for the JSON report
+        video_results: Per-video statistics from process_videos_parallel
+        stage_seconds: Wall-clock seconds per pipeline stage
+        total_seconds: Wall-clock seconds of the whole pipeline
+    
+    Returns:
+        Path of the written report
+    """
+    video_results = sorted(video_results, key=lambda r: r['video_num'])
+    
+    logger.info("\nTIMING REPORT:")
+    for result in video_results:
+        logger.info(f"  Video {result['video_num']}: {result['seconds']:.1f}s, "
+                    f"{result['frames']} frames, {result['faces']} faces, "
+                    f"{result['frames_gated']} frames skipped by motion gate")
+    for stage, seconds in stage_seconds.items():
+        logger.info(f"  Stage {stage}: {seconds:.1f}s")
+    
+    # Sum of per-video time vs wall-clock time shows the parallel speedup
+    video_cpu_seconds = sum(r['seconds'] for r in video_results)
+    video_wall_seconds = stage_seconds.get('video_processing', 0)
+    speedup = video_cpu_seconds / video_wall_seconds if video_wall_seconds else 0
+    logger.info(f"  Total: {total_seconds:.1f}s (video stage speedup {speedup:.1f}x)")
+    
+    metadata_folder.mkdir(parents=True, exist_ok=True)
+    report_file = metadata_folder / "pipeline_report.json"
+    with open(report_file, 'w') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'total_seconds': round(total_seconds, 2),
+            'stage_seconds': stage_seconds,
+            'video_stage_speedup': round(speedup, 2),
+            'videos': video_results
+        }, f, indent=2)
+    
+    return report_file
+
+
 def main():
     """Main pipeline execution"""
     print_banner()
@@ -100,7 +158,8 @@ def main():
     # Import pipeline modules
     logger.info("\nLoading pipeline modules...")
     try:
-        from video_processor import CCTVVideoProcessor
+        from video_processor import CCTVVideoProcessor, process_videos_parallel
+        from pipeline_manifest import PipelineManifest, fingerprint
         logger.info("  [OK] Video processor module loaded")
     except ImportError as e:
         logger.error(f"  [FAILED] Failed to load video processor: {e}")
@@ -118,10 +177,66 @@ def main():
     logger.info("STEP 1: VIDEO PROCESSING & FRAME EXTRACTION")
     logger.info("="*70)
     
+    pipeline_start = time.perf_counter()
+    stage_seconds = {}
+    output_base = base_path / "processed_output"
+    manifest = PipelineManifest(output_base / "metadata" / "pipeline_manifest.json")
+    
     try:
-        processor = CCTVVideoProcessor(base_path)
-        processor.process_all_videos(frame_interval=5, start_video=2, end_video=5)
-        logger.info("[OK] Video processing complete")
+        # Only new, changed or interrupted videos are processed again
+        pending_videos = []
+        for video_num in VIDEO_NUMS:
+            video_path = video_folder / f"{video_num}.mp4"
+            if not video_path.exists():
+                logger.warning(f"Video not found, skipping: {video_path}")
+            elif manifest.video_is_current(video_path, VIDEO_CONFIG):
+                logger.info(f"  [SKIP] Video {video_num} unchanged since last run")
+            else:
+                pending_videos.append(video_num)
+        
+        if pending_videos:
+            CCTVVideoProcessor(base_path).analyze_reference_video(video_num=1)
+        
+        for video_num in pending_videos:
+            outputs = {
+                'frames': output_base / "frames" / f"video_{video_num}",
+                'faces': output_base / "extracted_faces" / f"video_{video_num}"
+            }
+            # Drop partial or outdated outputs so stale frames/faces do not survive
+            for folder in outputs.values():
+                if folder.exists():
+                    shutil.rmtree(folder)
+                folder.mkdir(parents=True)
+            # Faces are re-extracted under the same names, so their clustering restarts too
+            cluster_state = output_base / "metadata" / "face_clusters" / f"video_{video_num}.npz"
+            if cluster_state.exists():
+                cluster_state.unlink()
+            organized_faces = output_base / "faces_organized_by_person" / f"video_{video_num}"
+            if organized_faces.exists():
+                shutil.rmtree(organized_faces)
+            manifest.mark_video_running(video_folder / f"{video_num}.mp4", VIDEO_CONFIG, outputs)
+        
+        def record_video(stats):
+            if 'error' not in stats:
+                manifest.mark_video_done(video_folder / f"{stats['video_num']}.mp4", stats)
+        
+        # Videos write to separate video_N folders, so each runs in its own process
+        stage_start = time.perf_counter()
+        video_results = process_videos_parallel(
+            base_path, pending_videos,
+            frame_interval=VIDEO_CONFIG['frame_interval'],
+            motion_gate=VIDEO_CONFIG['motion_gate'],
+            motion_sensitivity=VIDEO_CONFIG['motion_sensitivity'],
+            force_detection_seconds=VIDEO_CONFIG['force_detection_seconds'],
+            on_result=record_video
+        )
+        stage_seconds['video_processing'] = round(time.perf_counter() - stage_start, 2)
+        
+        failed_videos = [r['video_num'] for r in video_results if 'error' in r]
+        if failed_videos:
+            logger.error(f"[FAILED] Video processing failed for videos: {failed_videos}")
+            return False
+        logger.info(f"[OK] Video processing complete in {stage_seconds['video_processing']}s")
     except Exception as e:
         logger.error(f"[FAILED] Video processing failed: {e}")
         import traceback
@@ -134,8 +249,19 @@ def main():
     logger.info("="*70)
     
     try:
-        employee_db = setup_face_recognition_pipeline(base_path, compreface_path)
-        logger.info("[OK] Face recognition pipeline complete")
+        # The stage depends on exactly which video contents were processed, and how
+        face_inputs = fingerprint({
+            path: [entry['content_hash'], entry['config']]
+            for path, entry in manifest.video_entries().items()
+        })
+        if manifest.stage_is_current('face_recognition', face_inputs):
+            logger.info("[SKIP] Face recognition outputs are up to date")
+        else:
+            stage_start = time.perf_counter()
+            employee_db = setup_face_recognition_pipeline(base_path, compreface_path)
+            stage_seconds['face_recognition'] = round(time.perf_counter() - stage_start, 2)
+            manifest.mark_stage_done('face_recognition', face_inputs)
+            logger.info(f"[OK] Face recognition pipeline complete in {stage_seconds['face_recognition']}s")
     except Exception as e:
         logger.error(f"[FAILED] Face recognition setup failed: {e}")
         import traceback
@@ -147,12 +273,14 @@ def main():
     logger.info("PIPELINE EXECUTION SUMMARY")
     logger.info("="*70)
     
-    output_base = base_path / "processed_output"
     frames_folder = output_base / "frames"
     faces_folder = output_base / "extracted_faces"
     employee_db_folder = output_base / "employee_database"
     metadata_folder = output_base / "metadata"
     
+    report_file = write_pipeline_report(metadata_folder, video_results, stage_seconds,
+                                        time.perf_counter() - pipeline_start)
+    
     logger.info(f"""
 OUTPUT LOCATIONS:
   [DIR] Base Output: {output_base}
@@ -164,6 +292,8 @@ OUTPUT LOCATIONS:
 KEY FILES:
   [FILE] Usage Guide: {metadata_folder / 'COMPREFACE_USAGE_GUIDE.md'}
   [FILE] Statistics: {metadata_folder / 'extraction_statistics.json'}
+  [FILE] Timing Report: {report_file}
+  [FILE] Pipeline Manifest: {manifest.manifest_path}
   [FILE] Execution Log: spi_pipeline.log
 
 NEXT STEPS:
@@ -8,6 +8,9 @@ import shutil
 from pathlib import Path
 import logging
 
+from face_clustering import FaceIdentityCollector
+from face_detectors import get_detector
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -16,13 +19,8 @@ logger = logging.getLogger(__name__)
 
 
 def detect_faces_in_frame(frame, min_size=(30, 30)):
-    """Detect faces in a frame"""
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-    )
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=min_size)
-    return faces
+    """Detect faces in a frame (the cascade is loaded once per process)"""
+    return get_detector('haar').detect(frame, min_size=min_size)
 
 
 def extract_clear_faces_from_frames(video_num, num_faces_needed, output_folder, base_path):
@@ -50,86 +48,36 @@ def extract_clear_faces_from_frames(video_num, num_faces_needed, output_folder,
     logger.info(f"\nProcessing Video {video_num}: Looking for {num_faces_needed} unique faces")
     logger.info(f"Scanning {len(frame_files)} frames...")
     
-    # Dictionary to store detected unique faces
-    unique_faces = {}
-    face_detection_info = {}
+    # Crops of each frame are matched to identities by nearest centroid
+    collector = FaceIdentityCollector(max_identities=num_faces_needed)
+    frames_with_faces = 0
     
     # Scan frames and detect faces
-    for frame_idx, frame_file in enumerate(frame_files):
-        frame = cv2.imread(str(frame_file))
-        if frame is None:
-            continue
-        
-        faces = detect_faces_in_frame(frame)
-        
-        if len(faces) > 0:
-            # Store info about each face detected
-            face_detection_info[frame_file] = {
-                'num_faces': len(faces),
-                'face_coords': faces
-            }
-            
-            # Try to determine which faces are new individuals
-            for face_idx, (x, y, w, h) in enumerate(faces):
-                # Extract face region
-                face_crop = frame[max(0, y-10):min(frame.shape[0], y+h+10), 
-                                 max(0, x-10):min(frame.shape[1], x+w+10)].copy()
-                
-                if face_crop.shape[0] < 20 or face_crop.shape[1] < 20:
-                    continue
-                
-                # Store this face with its frame and index
-                face_id = len(unique_faces)
-                if face_id < num_faces_needed:
-                    unique_faces[face_id] = {
-                        'frames': [frame_file],
-                        'face_crops': [face_crop],
-                        'avg_size': (w, h)
-                    }
-    
-    logger.info(f"Detected faces in {len(face_detection_info)} frames")
-    
-    # Now scan again to find multiple angles of same faces
-    for frame_idx, frame_file in enumerate(frame_files):
-        frame = cv2.imread(str(frame_file))
-        if frame is None:
-            continue
-        
-        if frame_file not in face_detection_info:
-            continue
-        
-        faces = face_detection_info[frame_file]['face_coords']
-        
-        # For each detected face
-        for face_idx, (x, y, w, h) in enumerate(faces):
+    for frame_file, frame, faces in get_detector('haar').detect_files(frame_files):
+        face_crops = []
+        for (x, y, w, h) in faces:
+            # Extract face region
             face_crop = frame[max(0, y-10):min(frame.shape[0], y+h+10), 
                              max(0, x-10):min(frame.shape[1], x+w+10)].copy()
             
             if face_crop.shape[0] < 20 or face_crop.shape[1] < 20:
                 continue
-            
-            # Try to match to existing faces
-            assigned = False
-            for face_id in range(min(num_faces_needed, len(unique_faces))):
-                if face_id in unique_faces:
-                    unique_faces[face_id]['frames'].append(frame_file)
-                    unique_faces[face_id]['face_crops'].append(face_crop)
-                    assigned = True
-                    
-                    # Only collect up to 10 angles per face
-                    if len(unique_faces[face_id]['frames']) >= 10:
-                        # Check if we have enough for next face
-                        if len(unique_faces) < num_faces_needed:
-                            break
-                    break
-            
-            # If not assigned to existing face and we need more faces
-            if not assigned and len(unique_faces) < num_faces_needed:
-                unique_faces[len(unique_faces)] = {
-                    'frames': [frame_file],
-                    'face_crops': [face_crop],
-                    'avg_size': (w, h)
-                }
+            face_crops.append(face_crop)
+        
+        if face_crops:
+            frames_with_faces += 1
+            collector.add_frame(frame_file, face_crops)
+    
+    logger.info(f"Detected faces in {frames_with_faces} frames")
+    
+    unique_faces = {
+        face_id: {
+            'frames': identity['frames'],
+            'face_crops': identity['crops'],
+            'avg_size': identity['size']
+        }
+        for face_id, identity in collector.identities.items()
+    }
     
     logger.info(f"Identified {len(unique_faces)} unique faces")
     
@@ -0,0 +1,71 @@
+"""
+Face Detector Smoke Tests
+Builds every backend get_detector advertises and runs it on a blank frame,
+and reads frame files through detect_files
+"""
+
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from face_detectors import DETECTOR_BACKENDS, FaceDetector, get_detector
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+COMPREFACE_PATH = SCRIPT_DIR.parent / "CompreFace-master"
+
+# Constructor options and the optional modules each backend needs
+BACKEND_OPTIONS = {
+    'haar': ({}, []),
+    'mediapipe': ({'model_path': SCRIPT_DIR / "blaze_face_short_range.tflite"}, ['mediapipe']),
+    'mtcnn': ({'compreface_path': COMPREFACE_PATH}, ['tensorflow']),
+    'dnn': ({'model_path': os.getenv('DNN_FACE_MODEL'), 'config_path': os.getenv('DNN_FACE_CONFIG')}, []),
+}
+
+
+def test_every_backend_has_smoke_test_options():
+    assert set(BACKEND_OPTIONS) == set(DETECTOR_BACKENDS)
+
+
+@pytest.mark.parametrize('backend', sorted(DETECTOR_BACKENDS))
+def test_backend_builds_and_detects_on_blank_frame(backend):
+    options, modules = BACKEND_OPTIONS[backend]
+    for module in modules:
+        pytest.importorskip(module)
+    if any(value is None or not Path(value).exists() for value in options.values()):
+        pytest.skip(f"{backend} model files not available")
+
+    detector = get_detector(backend, **options)
+    faces = detector.detect(np.zeros((240, 320, 3), dtype=np.uint8))
+
+    assert detector is get_detector(backend, **options)
+    assert faces.shape == (0, 4)
+
+
+class _CountingDetector(FaceDetector):
+    """Finds no faces; records the frames it was given"""
+
+    def __init__(self):
+        self.frames_seen = 0
+
+    def detect(self, frame, min_size=(30, 30)):
+        self.frames_seen += 1
+        return np.zeros((0, 4), dtype=int)
+
+
+@pytest.mark.parametrize('read_workers', [1, 4])
+def test_detect_files_reads_every_frame_in_order(tmp_path, read_workers):
+    frame_files = []
+    for idx in range(5):
+        frame_file = tmp_path / f"frame_{idx:06d}.jpg"
+        cv2.imwrite(str(frame_file), np.full((32, 32, 3), idx * 40, dtype=np.uint8))
+        frame_files.append(frame_file)
+    frame_files.insert(2, tmp_path / "missing.jpg")
+    detector = _CountingDetector()
+
+    results = list(detector.detect_files(frame_files, batch_size=2, read_workers=read_workers))
+
+    assert [frame_file for frame_file, _, _ in results] == [f for f in frame_files if f.exists()]
+    assert detector.frames_seen == 5
@@ -6,7 +6,11 @@ Processes video footage to extract frames and detect employee faces for SPI (Sec
 import cv2
 import os
 import sys
+import queue
+import threading
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import logging
@@ -14,6 +18,9 @@ import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+from motion_gate import MotionGate
+from video_writer import StreamingVideoWriter
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +29,119 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class AsyncFrameWriter:
+    """Write frames to disk on a background thread"""
+    
+    def __init__(self, max_pending=64, jpeg_quality=95):
+        """
+        Initialize the writer thread
+        
+        Args:
+            max_pending: Maximum queued frames before write() blocks (bounds memory)
+            jpeg_quality: JPEG quality for written frames
+        """
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.frames_written = 0
+        self.write_errors = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+    
+    def write(self, path, frame):
+        """Queue a frame for writing; the caller must not modify it afterwards"""
+        self._queue.put((str(path), frame))
+    
+    def close(self):
+        """Flush all pending frames and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, frame = item
+            if cv2.imwrite(path, frame, self.jpeg_params):
+                self.frames_written += 1
+            else:
+                self.write_errors += 1
+                logger.error(f"Failed to write frame: {path}")
+
+
+class CCTVStyler:
+    """
+    Allocation-free CCTV styling
+    
+    Contrast and brightness are fused into one 256-entry lookup table, and the
+    Gaussian sensor noise is taken from a preallocated buffer at a random
+    offset, so styling a frame needs no float intermediates.
+    """
+    
+    NOISE_SIGMA = 2.0
+    NOISE_OFFSETS = 4096
+    
+    def __init__(self, seed=None):
+        self._rng = np.random.default_rng(seed)
+        self._luts = {}
+        self._noise_pos = None
+        self._noise_neg = None
+    
+    def _get_lut(self, brightness_adjustment, contrast_adjustment):
+        key = (brightness_adjustment, contrast_adjustment)
+        lut = self._luts.get(key)
+        if lut is None:
+            # Same math as the former float pipeline: clip(clip(v * contrast) * brightness)
+            values = np.arange(256, dtype=np.float32) / 255.0
+            values = np.clip(values * contrast_adjustment, 0, 1)
+            values = np.clip(values * brightness_adjustment, 0, 1)
+            lut = (values * 255).astype(np.uint8)
+            self._luts[key] = lut
+        return lut
+    
+    def _get_noise(self, size):
+        """Return (positive, negative) uint8 noise views of `size` elements"""
+        if self._noise_pos is None or self._noise_pos.size < size + self.NOISE_OFFSETS:
+            noise = np.rint(self._rng.normal(0, self.NOISE_SIGMA, size + self.NOISE_OFFSETS))
+            self._noise_pos = np.clip(noise, 0, 255).astype(np.uint8)
+            self._noise_neg = np.clip(-noise, 0, 255).astype(np.uint8)
+        
+        offset = int(self._rng.integers(0, self.NOISE_OFFSETS))
+        return (self._noise_pos[offset:offset + size],
+                self._noise_neg[offset:offset + size])
+    
+    def apply(self, frame, brightness_adjustment=1.1, contrast_adjustment=1.2, inplace=False):
+        """
+        Style a uint8 frame
+        
+        Args:
+            frame: Input frame (uint8, contiguous)
+            brightness_adjustment: Brightness multiplier
+            contrast_adjustment: Contrast multiplier
+            inplace: Write into `frame` instead of a new array
+        
+        Returns:
+            Styled frame
+        """
+        lut = self._get_lut(brightness_adjustment, contrast_adjustment)
+        if inplace:
+            out = cv2.LUT(frame, lut, dst=frame)
+        else:
+            out = cv2.LUT(frame, lut)
+        
+        # Add slight Gaussian blur for CCTV-like quality
+        cv2.GaussianBlur(out, (3, 3), 0, dst=out)
+        
+        # Add noise with saturating uint8 arithmetic (no float intermediate)
+        noise_pos, noise_neg = self._get_noise(out.size)
+        noise_pos = noise_pos.reshape(out.shape)
+        noise_neg = noise_neg.reshape(out.shape)
+        cv2.add(out, noise_pos, dst=out)
+        cv2.subtract(out, noise_neg, dst=out)
+        
+        return out
+
+
 class CCTVVideoProcessor:
     """Process CCTV videos, extract frames, and detect faces"""
     
@@ -38,25 +158,32 @@ class CCTVVideoProcessor:
         self.frames_folder = self.output_base / "frames"
         self.faces_folder = self.output_base / "extracted_faces"
         self.cctv_styled_folder = self.output_base / "cctv_styled_videos"
+        self.styler = CCTVStyler()
         
         # Create output directories
         self._create_output_directories()
         
-        # Initialize MediaPipe Face Detector with high confidence threshold
-        model_path = self.base_path / "blaze_face_short_range.tflite"
-        if not model_path.exists():
-            logger.error(f"MediaPipe model not found: {model_path}")
-            raise FileNotFoundError(f"Please download the face detection model to {model_path}")
-        
-        base_options = python.BaseOptions(model_asset_path=str(model_path))
-        options = vision.FaceDetectorOptions(
-            base_options=base_options,
-            min_detection_confidence=0.9,
-            min_suppression_threshold=0.3
-        )
-        self.face_detector = vision.FaceDetector.create_from_options(options)
-        
-        logger.info("MediaPipe Face Detection initialized with confidence threshold: 0.9")
+        # MediaPipe Face Detector is created lazily on first use, so processors
+        # can be constructed cheaply (e.g. once per worker process)
+        self.model_path = self.base_path / "blaze_face_short_range.tflite"
+        if not self.model_path.exists():
+            logger.error(f"MediaPipe model not found: {self.model_path}")
+            raise FileNotFoundError(f"Please download the face detection model to {self.model_path}")
+        self._face_detector = None
+    
+    @property
+    def face_detector(self):
+        """MediaPipe Face Detector with high confidence threshold"""
+        if self._face_detector is None:
+            base_options = python.BaseOptions(model_asset_path=str(self.model_path))
+            options = vision.FaceDetectorOptions(
+                base_options=base_options,
+                min_detection_confidence=0.9,
+                min_suppression_threshold=0.3
+            )
+            self._face_detector = vision.FaceDetector.create_from_options(options)
+            logger.info("MediaPipe Face Detection initialized with confidence threshold: 0.9")
+        return self._face_detector
     
     def _create_output_directories(self):
         """Create all necessary output directories"""
@@ -101,44 +228,22 @@ class CCTVVideoProcessor:
         
         return properties
     
-    def apply_cctv_style(self, frame, brightness_adjustment=1.1, contrast_adjustment=1.2):
+    def apply_cctv_style(self, frame, brightness_adjustment=1.1, contrast_adjustment=1.2, inplace=False):
         """
         Apply CCTV footage styling to a frame
-        - Add timestamp
         - Adjust brightness and contrast
         - Add slight blur/noise for realism
-        - Add CCTV information overlay
         
         Args:
-            frame: Input frame
+            frame: Input frame (uint8)
             brightness_adjustment: Brightness multiplier
             contrast_adjustment: Contrast multiplier
+            inplace: Style the input frame in place instead of a copy
         
         Returns:
             Styled frame
         """
-        # Convert to float for processing
-        frame_float = frame.astype(np.float32) / 255.0
-        
-        # Apply contrast
-        frame_float = frame_float * contrast_adjustment
-        frame_float = np.clip(frame_float, 0, 1)
-        
-        # Apply brightness
-        frame_float = frame_float * brightness_adjustment
-        frame_float = np.clip(frame_float, 0, 1)
-        
-        # Convert back to uint8
-        frame = (frame_float * 255).astype(np.uint8)
-        
-        # Add slight Gaussian blur for CCTV-like quality
-        frame = cv2.GaussianBlur(frame, (3, 3), 0)
-        
-        # Add noise (optional, for realism)
-        noise = np.random.normal(0, 2, frame.shape)
-        frame = np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)
-        
-        return frame
+        return self.styler.apply(frame, brightness_adjustment, contrast_adjustment, inplace=inplace)
     
     def add_timestamp_overlay(self, frame, timestamp_text=None):
         """
@@ -204,16 +309,7 @@ class CCTVVideoProcessor:
             
             # Extract every nth frame
             if frame_count % frame_interval == 0:
-                # Apply CCTV styling
-                styled_frame = self.apply_cctv_style(frame)
-                
-                # Add timestamp overlay
-                if add_overlay:
-                    frame_time = frame_count / fps
-                    minutes = int(frame_time // 60)
-                    seconds = int(frame_time % 60)
-                    timestamp = f"{minutes:02d}:{seconds:02d} - Video {video_num}"
-                    styled_frame = self.add_timestamp_overlay(styled_frame, timestamp)
+                styled_frame = self._style_frame(frame, frame_count, fps, video_num, add_overlay)
                 
                 # Save frame
                 frame_filename = f"frame_{extracted_frames:06d}.jpg"
@@ -232,6 +328,132 @@ class CCTVVideoProcessor:
         
         return frame_paths
     
+    def _style_frame(self, frame, frame_count, fps, video_num, add_overlay=True):
+        """Apply CCTV styling and the optional timestamp overlay in place on a decoded frame"""
+        styled_frame = self.apply_cctv_style(frame, inplace=True)
+        
+        if add_overlay:
+            frame_time = frame_count / fps
+            minutes = int(frame_time // 60)
+            seconds = int(frame_time % 60)
+            timestamp = f"{minutes:02d}:{seconds:02d} - Video {video_num}"
+            styled_frame = self.add_timestamp_overlay(styled_frame, timestamp)
+        
+        return styled_frame
+    
+    def process_video_single_pass(self, video_num, frame_interval=5, add_overlay=True,
+                                  save_frames=True, async_writes=True, gate=None,
+                                  write_video=False, video_fps=5.0):
+        """
+        Decode a video once: detect faces on the in-memory frame and
+        (optionally) write the CCTV-styled frame in the same pass
+        
+        Unlike extract_frames_from_video + re-reading the JPEGs, detection runs on the
+        clean decoded frame instead of the lossy, noise-injected, overlaid copy.
+        
+        Args:
+            video_num: Video number to process
+            frame_interval: Process every nth frame
+            add_overlay: Whether to add timestamp overlay to written frames
+            save_frames: Write CCTV-styled frames to the frames folder
+            async_writes: Write styled frames on a background writer thread
+            gate: Optional MotionGate deciding which frames need face detection
+            write_video: Also encode the styled frames straight into
+                cctv_styled_videos/video_N_cctv_styled.mp4 (no JPEG round trip)
+            video_fps: Frame rate of that video
+        
+        Returns:
+            Dictionary with frame and face counts
+        """
+        stats = {'frames': 0, 'faces': 0, 'frames_with_faces': 0, 'frames_gated': 0}
+        video_path = self.video_folder / f"{video_num}.mp4"
+        
+        if not video_path.exists():
+            logger.error(f"Video not found: {video_path}")
+            return stats
+        
+        logger.info(f"Processing video {video_num} (single pass)...")
+        
+        cap = cv2.VideoCapture(str(video_path))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        
+        video_frames_folder = self.frames_folder / f"video_{video_num}"
+        writer = None
+        if save_frames:
+            video_frames_folder.mkdir(parents=True, exist_ok=True)
+            if async_writes:
+                writer = AsyncFrameWriter()
+        video_writer = None
+        if write_video:
+            video_writer = StreamingVideoWriter(
+                self.cctv_styled_folder / f"video_{video_num}_cctv_styled.mp4", fps=video_fps
+            )
+        if gate is not None:
+            gate.reset()
+        
+        frame_count = 0
+        try:
+            while True:
+                # grab() skips decoding of frames that are not sampled
+                if frame_count % frame_interval != 0:
+                    if not cap.grab():
+                        break
+                    frame_count += 1
+                    continue
+                
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                
+                frame_idx = stats['frames']
+                
+                # Detect first: styling below happens in place on the decoded frame
+                if gate is not None and not gate.should_detect(frame, frame_count / fps):
+                    stats['frames_gated'] += 1
+                else:
+                    saved_count = self._detect_and_save_faces(frame, video_num, frame_idx)
+                    if saved_count > 0:
+                        stats['faces'] += saved_count
+                        stats['frames_with_faces'] += 1
+                
+                if save_frames or video_writer is not None:
+                    styled_frame = self._style_frame(frame, frame_count, fps, video_num, add_overlay)
+                if save_frames:
+                    frame_path = video_frames_folder / f"frame_{frame_idx:06d}.jpg"
+                    if writer is not None:
+                        # cap.read() returns a fresh array per frame, so it can be handed off
+                        writer.write(frame_path, styled_frame)
+                    else:
+                        cv2.imwrite(str(frame_path), styled_frame)
+                if video_writer is not None:
+                    # Both writers only read the styled frame
+                    video_writer.write(styled_frame)
+                
+                stats['frames'] += 1
+                if stats['frames'] % 100 == 0:
+                    logger.info(f"  Processed {stats['frames']} frames from video {video_num}")
+                
+                frame_count += 1
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.close()
+            if video_writer is not None and video_writer.close():
+                logger.info(f"[OK] Video {video_num}: wrote {video_writer.output_video_path}")
+        
+        logger.info(f"[OK] Video {video_num}: {stats['frames']} frames, "
+                    f"{stats['faces']} faces in {stats['frames_with_faces']} frames")
+        return stats
+    
+    def _detect_and_save_faces(self, frame, video_num, frame_idx):
+        """Detect, crop and save faces of one frame; returns the number of saved faces"""
+        faces = self.detect_faces_in_frame(frame)
+        if len(faces) == 0:
+            return 0
+        
+        face_images = self.extract_face_images(frame, faces, video_num, frame_idx)
+        return self.save_face_images(face_images, video_num, frame_idx)
+    
     def preprocess_frame(self, frame):
         """
         Preprocess frame to reduce false positives
@@ -524,7 +746,16 @@ class CCTVVideoProcessor:
         
         return face_img
     
-    def process_all_videos(self, frame_interval=30, start_video=2, end_video=5):
+    def _get_video_fps(self, video_num, default=30.0):
+        """Read the frame rate of a source video"""
+        cap = cv2.VideoCapture(str(self.video_folder / f"{video_num}.mp4"))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        return fps if fps and fps > 0 else default
+    
+    def process_all_videos(self, frame_interval=30, start_video=2, end_video=5,
+                           motion_gate=False, motion_sensitivity=0.005, force_detection_seconds=5.0,
+                           single_pass=False, save_frames=True, async_writes=True):
         """
         Process all videos (2-5) to extract frames and faces
         
@@ -532,12 +763,25 @@ class CCTVVideoProcessor:
             frame_interval: Extract every nth frame (30=1 FPS for 30fps video)
             start_video: Starting video number
             end_video: Ending video number
+            motion_gate: Skip face detection on frames without motion
+            motion_sensitivity: Fraction of changed pixels that counts as motion
+            force_detection_seconds: Run detection at least this often even without motion
+            single_pass: Detect on decoded frames instead of re-reading the written JPEGs
+                (faster, but detection sees the clean frame rather than the styled JPEG)
+            save_frames: Write CCTV-styled frames (single-pass mode only; always written otherwise)
+            async_writes: Write styled frames on a background thread (single-pass mode only)
         """
         # First analyze reference video
         ref_properties = self.analyze_reference_video(video_num=1)
         
         total_frames_processed = 0
         total_faces_extracted = 0
+        total_frames_gated = 0
+        
+        gate = None
+        if motion_gate:
+            gate = MotionGate(sensitivity=motion_sensitivity,
+                              force_interval_seconds=force_detection_seconds)
         
         # Process videos 2-5
         for video_num in range(start_video, end_video + 1):
@@ -545,6 +789,16 @@ class CCTVVideoProcessor:
             logger.info(f"Processing Video {video_num}")
             logger.info(f"{'='*60}")
             
+            if single_pass:
+                stats = self.process_video_single_pass(
+                    video_num, frame_interval, add_overlay=True,
+                    save_frames=save_frames, async_writes=async_writes, gate=gate
+                )
+                total_frames_processed += stats['frames']
+                total_faces_extracted += stats['faces']
+                total_frames_gated += stats['frames_gated']
+                continue
+            
             # Extract frames
             frame_paths = self.extract_frames_from_video(video_num, frame_interval, add_overlay=True)
             total_frames_processed += len(frame_paths)
@@ -553,6 +807,9 @@ class CCTVVideoProcessor:
             
             video_faces_count = 0
             frames_with_faces = 0
+            video_fps = self._get_video_fps(video_num)
+            if gate is not None:
+                gate.reset()
             
             # Detect faces in extracted frames
             for frame_idx, frame_path in enumerate(frame_paths):
@@ -560,12 +817,13 @@ class CCTVVideoProcessor:
                 if frame is None:
                     continue
                 
-                faces = self.detect_faces_in_frame(frame)
+                frame_time = frame_idx * frame_interval / video_fps
+                if gate is not None and not gate.should_detect(frame, frame_time):
+                    total_frames_gated += 1
+                    continue
                 
-                if len(faces) > 0:
-                    # Extract and save faces
-                    face_images = self.extract_face_images(frame, faces, video_num, frame_idx)
-                    saved_count = self.save_face_images(face_images, video_num, frame_idx)
+                saved_count = self._detect_and_save_faces(frame, video_num, frame_idx)
+                if saved_count > 0:
                     video_faces_count += saved_count
                     frames_with_faces += 1
                 
@@ -581,11 +839,100 @@ class CCTVVideoProcessor:
         logger.info(f"{'='*60}")
         logger.info(f"Total frames processed: {total_frames_processed}")
         logger.info(f"Total faces extracted: {total_faces_extracted}")
+        if gate is not None:
+            logger.info(f"Frames skipped by motion gate: {total_frames_gated}/{total_frames_processed}")
         logger.info(f"Output location: {self.output_base}")
         logger.info(f"  - Frames: {self.frames_folder}")
         logger.info(f"  - Faces: {self.faces_folder}")
 
 
+# Per-process processor used by process_videos_parallel workers
+_worker_processor = None
+
+
+def _process_video_worker(base_path, video_num, frame_interval, motion_gate,
+                          motion_sensitivity, force_detection_seconds, save_frames,
+                          write_video=False):
+    """Process one video in a worker process, reusing that worker's processor"""
+    global _worker_processor
+    if _worker_processor is None or _worker_processor.base_path != Path(base_path):
+        _worker_processor = CCTVVideoProcessor(base_path)
+    
+    gate = None
+    if motion_gate:
+        gate = MotionGate(sensitivity=motion_sensitivity,
+                          force_interval_seconds=force_detection_seconds)
+    
+    start = time.perf_counter()
+    stats = _worker_processor.process_video_single_pass(
+        video_num, frame_interval, add_overlay=True,
+        save_frames=save_frames, async_writes=True, gate=gate, write_video=write_video
+    )
+    stats['video_num'] = video_num
+    stats['worker_pid'] = os.getpid()
+    stats['seconds'] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+def process_videos_parallel(base_path, video_nums, frame_interval=30, max_workers=None,
+                            motion_gate=False, motion_sensitivity=0.005,
+                            force_detection_seconds=5.0, save_frames=True, write_video=False,
+                            on_result=None):
+    """
+    Process several videos concurrently, one video per worker process
+    
+    Each video writes to its own video_N frame and face folders, so workers
+    share no output state. Each worker creates its own MediaPipe detector on
+    its first video.
+    
+    Args:
+        base_path: Base directory containing video and output folders
+        video_nums: Video numbers to process
+        frame_interval: Process every nth frame
+        max_workers: Worker processes (default: one per video, capped at CPU count)
+        motion_gate: Skip face detection on frames without motion
+        motion_sensitivity: Fraction of changed pixels that counts as motion
+        force_detection_seconds: Run detection at least this often even without motion
+        save_frames: Write CCTV-styled frames
+        write_video: Encode the styled frames straight into a CCTV-styled video
+        on_result: Optional callable(stats) invoked in this process as each video finishes
+    
+    Returns:
+        List of per-video statistics (frames, faces, seconds, ...) in completion order
+    """
+    video_nums = list(video_nums)
+    if not video_nums:
+        return []
+    if max_workers is None:
+        max_workers = min(len(video_nums), os.cpu_count() or 1)
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _process_video_worker, str(base_path), video_num, frame_interval,
+                motion_gate, motion_sensitivity, force_detection_seconds, save_frames,
+                write_video
+            ): video_num
+            for video_num in video_nums
+        }
+        for future in as_completed(futures):
+            video_num = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                logger.error(f"[FAILED] Video {video_num}: {e}")
+                stats = {'video_num': video_num, 'error': str(e)}
+            results.append(stats)
+            if on_result is not None:
+                on_result(stats)
+            logger.info(f"[{len(results)}/{len(video_nums)}] Video {video_num} finished"
+                        + (f" in {stats['seconds']}s: {stats['frames']} frames, {stats['faces']} faces"
+                           if 'error' not in stats else " with errors"))
+    
+    return results
+
+
 def main():
     """Main execution function"""
     base_path = r"d:\Main File store\Ajin\Project\cctv footage for spi\real cctv"
@@ -0,0 +1,82 @@
+"""
+Video Writer Module
+Encodes frames into a video file on a background thread, so decoding or
+styling the next frames overlaps with encoding
+"""
+
+import queue
+import threading
+import logging
+from pathlib import Path
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingVideoWriter:
+    """Encode frames into a video file on a dedicated writer thread"""
+    
+    def __init__(self, output_video_path, fps=5.0, codec='mp4v', max_pending=32):
+        """
+        Initialize the writer thread (the file is opened on the first frame)
+        
+        Args:
+            output_video_path: Output video file path
+            fps: Frame rate for output video
+            codec: FourCC code of the video codec
+            max_pending: Maximum queued frames before write() blocks (bounds memory)
+        """
+        self.output_video_path = Path(output_video_path)
+        self.fps = fps
+        self.codec = codec
+        self.frames_written = 0
+        self.failed = False
+        self._frame_size = None
+        self._out = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="video-writer", daemon=True)
+        self._thread.start()
+    
+    def write(self, frame):
+        """Queue a frame for encoding; the caller must not modify it afterwards"""
+        self._queue.put(frame)
+    
+    def close(self):
+        """
+        Flush all pending frames and finalize the video file
+        
+        Returns:
+            True if the video was written
+        """
+        self._queue.put(None)
+        self._thread.join()
+        return not self.failed and self.frames_written > 0
+    
+    def _open(self, frame):
+        height, width = frame.shape[:2]
+        self._frame_size = (width, height)
+        fourcc = cv2.VideoWriter_fourcc(*self.codec)
+        self._out = cv2.VideoWriter(str(self.output_video_path), fourcc, self.fps, self._frame_size)
+        if not self._out.isOpened():
+            logger.error(f"Failed to create video writer: {self.output_video_path}")
+            self.failed = True
+    
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self.failed:
+                continue  # keep draining so producers never block
+            if self._out is None:
+                self._open(frame)
+                if self.failed:
+                    continue
+            # VideoWriter silently drops frames whose size differs from the first one
+            if (frame.shape[1], frame.shape[0]) != self._frame_size:
+                frame = cv2.resize(frame, self._frame_size)
+            self._out.write(frame)
+            self.frames_written += 1
+        if self._out is not None:
+            self._out.release()